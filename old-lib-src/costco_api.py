@@ -7,21 +7,57 @@ Serves data from the SQL database through RESTful endpoints.
 """
 
 import json
-from datetime import datetime
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 
-from flask import Flask, jsonify, request, abort
+import orjson
+from flask import Flask, Response, g, jsonify, request, abort
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from flask_restx import Api, Resource, fields, Namespace
 from werkzeug.exceptions import NotFound, BadRequest
 
+# Optional binary representation for internal clients
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 from costco_database import CostcoDatabase
 from costco_service import CostcoService
 
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster response serialization."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS, default=self.default
+        ).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['RESTX_MASK_SWAGGER'] = False  # Disable field masking for cleaner docs
 
+# In-process response cache for the near-static stats/info endpoints
+CACHE_TIMEOUT = 30
+cache = Cache(app, config={
+    'CACHE_TYPE': 'SimpleCache',
+    'CACHE_DEFAULT_TIMEOUT': CACHE_TIMEOUT
+})
+
 # Initialize Flask-RESTX API with Swagger documentation
 api = Api(
     app,
@@ -34,10 +70,137 @@ api = Api(
     license_url='https://opensource.org/licenses/MIT'
 )
 
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Serialize Flask-RESTX responses with orjson instead of stdlib json."""
+    body = orjson.dumps(
+        data, option=orjson.OPT_NON_STR_KEYS, default=DefaultJSONProvider.default
+    )
+    resp = _json_bytes_response(body)
+    resp.status_code = code
+    resp.headers.extend(headers or {})
+    return resp
+
+
+def _json_bytes_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response without further copying or encoding."""
+    return Response(body, mimetype='application/json', direct_passthrough=True)
+
+
+def _wants_msgpack(*args: Any, **kwargs: Any) -> bool:
+    """Check whether the client explicitly prefers MessagePack over JSON."""
+    return MSGPACK_AVAILABLE and request.accept_mimetypes.best_match(
+        ['application/json', 'application/msgpack']
+    ) == 'application/msgpack'
+
+
+def _msgpack_response(data: Any, code: int = 200) -> Response:
+    """Pack data as MessagePack, stringifying values msgpack can't encode natively."""
+    body = msgpack.packb(data, use_bin_type=True, default=str)
+    return Response(body, status=code, mimetype='application/msgpack', direct_passthrough=True)
+
+
+if MSGPACK_AVAILABLE:
+    @api.representation('application/msgpack')
+    def output_msgpack(data, code, headers=None):
+        """Serialize Flask-RESTX responses as MessagePack for clients that ask for it."""
+        resp = _msgpack_response(data, code)
+        resp.headers.extend(headers or {})
+        return resp
+
+
+def _serve_json_bytes(body: bytes) -> Response:
+    """Serve pre-serialized JSON, transcoding it for clients that prefer MessagePack."""
+    if _wants_msgpack():
+        return _msgpack_response(orjson.loads(body))
+    return _json_bytes_response(body)
+
+
+def _rows_to_dicts(cursor, casts: Optional[Dict[str, Any]] = None,
+                   defaults: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Convert the remaining rows of an executed cursor to dicts in one pass.
+
+    Args:
+        cursor: Cursor with row_factory unset so rows come back as plain tuples
+        casts: Optional column name -> type mapping applied to non-null values,
+            matching what the equivalent RESTX model would have produced
+        defaults: Optional column name -> value used in place of NULL, matching
+            the equivalent RESTX model's field defaults
+
+    Returns:
+        Row dictionaries keyed by column name
+    """
+    cols = [c[0] for c in cursor.description]
+    rows = cursor.fetchall()
+    cast_idx = [(cols.index(c), t) for c, t in (casts or {}).items() if c in cols]
+    default_idx = [(cols.index(c), v) for c, v in (defaults or {}).items() if c in cols]
+    if cast_idx or default_idx:
+        rows = [list(r) for r in rows]
+        for r in rows:
+            for i, t in cast_idx:
+                if r[i] is not None:
+                    r[i] = t(r[i])
+            for i, v in default_idx:
+                if r[i] is None:
+                    r[i] = v
+    return [dict(zip(cols, r)) for r in rows]
+
 # Initialize database connection
 db = CostcoDatabase()
 service = CostcoService()
 
+# Short-lived cache of the most recent session id, used as the default
+# session by endpoints that accept an optional session_id
+_latest_session_cache = {'id': None, 'expires': 0.0}
+
+
+def _get_latest_session_id(ttl: float = 5.0) -> Optional[str]:
+    """Return the most recent session id, re-querying at most once per ttl seconds."""
+    now = time.monotonic()
+    if now < _latest_session_cache['expires']:
+        return _latest_session_cache['id']
+    sid = db.get_latest_session_id()
+    _latest_session_cache.update(id=sid, expires=now + ttl)
+    return sid
+
+
+# ISO-8601 UTC timestamp, reformatted at most once per wall-clock second
+_ts_cache = {'sec': -1, 'iso': ''}
+
+
+def _iso_now() -> str:
+    """Return the current UTC time as an ISO-8601 string with second precision."""
+    sec = int(time.time())
+    if sec != _ts_cache['sec']:
+        _ts_cache.update(sec=sec, iso=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(sec)))
+    return _ts_cache['iso']
+
+
+def _request_conn():
+    """Return the pooled connection bound to the current request, acquiring it on first use."""
+    if 'conn' not in g:
+        g.conn = db.acquire_connection()
+    return g.conn
+
+
+@app.teardown_request
+def release_request_conn(exc=None):
+    """Hand the request's connection back to the pool."""
+    conn = g.pop('conn', None)
+    if conn is not None:
+        db.release_connection(conn)
+
+
+def _ping_database():
+    """Cheap liveness check on the request's database connection."""
+    _request_conn().execute("SELECT 1").fetchone()
+
+
+@cache.memoize(timeout=CACHE_TIMEOUT)
+def _total_sessions() -> int:
+    """Count scraping sessions, cached because health probes poll frequently."""
+    return _request_conn().execute("SELECT COUNT(*) FROM scraping_sessions").fetchone()[0]
+
 # API Namespaces
 sessions_ns = Namespace('sessions', description='Scraping sessions operations')
 categories_ns = Namespace('categories', description='Categories operations')
@@ -129,6 +292,13 @@ search_result_model = api.model('SearchResult', {
     'results': fields.List(fields.Nested(product_model), description='Search results')
 })
 
+# Columns each model serializes, so queries only read what is returned
+_SESSION_COLUMNS = tuple(session_model.keys())
+_CATEGORY_COLUMNS = tuple(category_model.keys())
+_PRODUCT_COLUMNS = tuple(product_model.keys())
+_CATEGORY_BY_ID_SQL = f"SELECT {', '.join(_CATEGORY_COLUMNS)} FROM categories WHERE id = ?"
+_PRODUCT_BY_ID_SQL = f"SELECT {', '.join(_PRODUCT_COLUMNS)} FROM products WHERE id = ?"
+
 # Error handling
 @api.errorhandler(NotFound)
 def handle_not_found(error):
@@ -142,6 +312,27 @@ def handle_bad_request(error):
 def handle_generic_error(error):
     return {'message': 'Internal server error'}, 500
 
+# HTTP caching for the endpoints served from the response cache
+_CACHEABLE_PATHS = frozenset({
+    '/api/v1/stats/database',
+    '/api/v1/stats/categories',
+    '/api/v1/stats/products',
+    '/api/v1/system/info',
+    '/api/v1/categories/hierarchy',
+})
+
+@app.after_request
+def add_cache_headers(response):
+    """Add Cache-Control/ETag to cacheable responses and answer conditional GETs."""
+    if (request.method == 'GET' and request.path in _CACHEABLE_PATHS
+            and response.status_code == 200):
+        response.cache_control.public = True
+        response.cache_control.max_age = CACHE_TIMEOUT
+        response.vary.add('Accept')  # JSON and MessagePack share the URL
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
 # Sessions Endpoints
 @sessions_ns.route('')
 class SessionsList(Resource):
@@ -154,12 +345,7 @@ class SessionsList(Resource):
         limit = request.args.get('limit', 10, type=int)
         status = request.args.get('status')
         
-        sessions = db.get_recent_sessions(limit)
-        
-        if status:
-            sessions = [s for s in sessions if s.get('status') == status]
-        
-        return sessions
+        return db.get_recent_sessions(limit, status=status, columns=_SESSION_COLUMNS)
 
 @sessions_ns.route('/<string:session_id>')
 class Session(Resource):
@@ -167,7 +353,7 @@ class Session(Resource):
     @sessions_ns.marshal_with(session_model)
     def get(self, session_id):
         """Get specific session details"""
-        stats = db.get_session_stats(session_id)
+        stats = db.get_session_stats(session_id, columns=_SESSION_COLUMNS)
         if not stats:
             abort(404, description=f"Session {session_id} not found")
         return stats
@@ -203,21 +389,14 @@ class CategoriesList(Resource):
         
         if not session_id:
             # Get latest session if none specified
-            recent_sessions = db.get_recent_sessions(1)
-            if not recent_sessions:
+            session_id = _get_latest_session_id()
+            if not session_id:
                 return []
-            session_id = recent_sessions[0]['session_id']
         
-        categories = db.get_categories(session_id, parent_id)
-        
-        # Apply filters
-        if category_type:
-            categories = [c for c in categories if c.get('category_type') == category_type]
-        
-        if is_leaf is not None:
-            categories = [c for c in categories if c.get('is_leaf') == is_leaf]
-        
-        return categories
+        return db.get_categories(
+            session_id, parent_id, category_type=category_type, is_leaf=is_leaf,
+            columns=_CATEGORY_COLUMNS
+        )
 
 @categories_ns.route('/<int:category_id>')
 class Category(Resource):
@@ -225,15 +404,15 @@ class Category(Resource):
     @categories_ns.marshal_with(category_model)
     def get(self, category_id):
         """Get specific category details"""
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM categories WHERE id = ?", (category_id,))
-            category = cursor.fetchone()
-            
-            if not category:
-                abort(404, description=f"Category {category_id} not found")
-            
-            return dict(category)
+        conn = _request_conn()
+        cursor = conn.cursor()
+        cursor.execute(_CATEGORY_BY_ID_SQL, (category_id,))
+        category = cursor.fetchone()
+        
+        if not category:
+            abort(404, description=f"Category {category_id} not found")
+        
+        return dict(category)
 
 @categories_ns.route('/<int:category_id>/products')
 class CategoryProducts(Resource):
@@ -241,45 +420,131 @@ class CategoryProducts(Resource):
     @categories_ns.marshal_list_with(product_model)
     def get(self, category_id):
         """Get products in a specific category"""
-        products = db.get_products_by_category(category_id)
+        products = db.get_products_by_category(category_id, columns=_PRODUCT_COLUMNS)
         return products
 
+# Serialized hierarchy trees for completed sessions, least recently used first
+HIERARCHY_CACHE_SIZE = 32
+_hierarchy_cache: "OrderedDict[str, bytes]" = OrderedDict()
+# Requests are served from several threads (dev server, gunicorn gthread)
+_hierarchy_cache_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class _HierarchyNode:
+    """Category tree node built straight from a category_hierarchy row."""
+    id: int
+    session_id: str
+    name: str
+    url: str
+    category_type: str
+    parent_category_id: Optional[int]
+    is_leaf: int
+    level: int
+    path: str
+    id_path: str
+    children: List['_HierarchyNode'] = field(default_factory=list)
+
+
+_HIERARCHY_SQL = """
+    SELECT id, session_id, name, url, category_type, parent_category_id,
+           is_leaf, level, path, id_path
+    FROM category_hierarchy
+    WHERE session_id = ?
+    ORDER BY level, path
+"""
+
+
+def _session_is_completed(session_id: str) -> bool:
+    """Check whether a session has finished and its data is immutable."""
+    cursor = _request_conn().cursor()
+    cursor.execute(
+        "SELECT status FROM scraping_sessions WHERE session_id = ?", (session_id,)
+    )
+    row = cursor.fetchone()
+    return row is not None and row['status'] == 'completed'
+
 @categories_ns.route('/hierarchy')
 class CategoriesHierarchy(Resource):
     @categories_ns.doc('get_category_hierarchy')
+    @cache.cached(query_string=True, unless=_wants_msgpack)
     @categories_ns.param('session_id', 'Session ID (uses latest if not specified)', type=str)
     def get(self):
         """Get category hierarchy tree"""
         session_id = request.args.get('session_id')
         
         if not session_id:
-            recent_sessions = db.get_recent_sessions(1)
-            if not recent_sessions:
+            session_id = _get_latest_session_id()
+            if not session_id:
                 return []
-            session_id = recent_sessions[0]['session_id']
         
-        hierarchy = db.get_category_hierarchy(session_id)
+        # Completed sessions never change, so their serialized tree is reused as-is
+        with _hierarchy_cache_lock:
+            body = _hierarchy_cache.get(session_id)
+            if body is not None:
+                _hierarchy_cache.move_to_end(session_id)
+        if body is not None:
+            return _serve_json_bytes(body)
+        
+        cursor = _request_conn().cursor()
+        cursor.row_factory = None
+        cursor.execute(_HIERARCHY_SQL, (session_id,))
         
-        # Build tree structure
-        def build_tree(categories, parent_id=None, level=0):
-            tree = []
-            for cat in categories:
-                if cat['level'] == level and (
-                    (parent_id is None and cat.get('parent_category_id') is None) or
-                    cat.get('parent_category_id') == parent_id
-                ):
-                    cat_dict = dict(cat)
-                    cat_dict['children'] = build_tree(categories, cat['id'], level + 1)
-                    tree.append(cat_dict)
-            return tree
+        # Build tree structure in a single pass using a parent -> children index
+        children_by_parent = defaultdict(list)
+        nodes = {}
+        for row in cursor.fetchall():
+            node = _HierarchyNode(*row)
+            nodes[node.id] = node
+            children_by_parent[node.parent_category_id].append(node)
         
-        return build_tree(hierarchy)
+        for parent_id, children in children_by_parent.items():
+            if parent_id in nodes:
+                nodes[parent_id].children = children
+        
+        # orjson serializes the slotted dataclasses natively, in field order
+        body = orjson.dumps(children_by_parent[None])
+        if _session_is_completed(session_id):
+            with _hierarchy_cache_lock:
+                _hierarchy_cache[session_id] = body
+                if len(_hierarchy_cache) > HIERARCHY_CACHE_SIZE:
+                    _hierarchy_cache.popitem(last=False)
+        
+        return _serve_json_bytes(body)
 
 # Products Endpoints
+_PRODUCT_CASTS = {
+    'price': float, 'original_price': float, 'rating': float,
+    'warehouse_only': bool, 'online_only': bool, 'member_exclusive': bool,
+}
+# Field defaults product_model fills in for NULL columns (e.g. currency -> 'CAD')
+_PRODUCT_DEFAULTS = {
+    name: field.default for name, field in product_model.items()
+    if field.default is not None
+}
+
+
+@lru_cache(maxsize=64)
+def _products_stmt(has_session: bool, has_brand: bool, has_min: bool,
+                   has_max: bool, has_avail: bool) -> str:
+    """Build the filtered products SELECT for a given combination of filters."""
+    query = f"SELECT {', '.join(_PRODUCT_COLUMNS)} FROM products WHERE 1=1"
+    if has_session:
+        query += " AND session_id = ?"
+    if has_brand:
+        query += " AND brand LIKE ?"
+    if has_min:
+        query += " AND price >= ?"
+    if has_max:
+        query += " AND price <= ?"
+    if has_avail:
+        query += " AND availability = ?"
+    return query + " ORDER BY name LIMIT ?"
+
 @products_ns.route('')
 class ProductsList(Resource):
     @products_ns.doc('list_products')
-    @products_ns.marshal_list_with(product_model)
+    @products_ns.response(200, 'Success', [product_model])
     @products_ns.param('session_id', 'Filter by session ID', type=str)
     @products_ns.param('brand', 'Filter by brand', type=str)
     @products_ns.param('min_price', 'Minimum price filter', type=float)
@@ -295,40 +560,37 @@ class ProductsList(Resource):
         availability = request.args.get('availability')
         limit = request.args.get('limit', 50, type=int)
         
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Build query with filters
-            query = "SELECT * FROM products WHERE 1=1"
-            params = []
-            
-            if session_id:
-                query += " AND session_id = ?"
-                params.append(session_id)
-            
-            if brand:
-                query += " AND brand LIKE ?"
-                params.append(f"%{brand}%")
-            
-            if min_price is not None:
-                query += " AND price >= ?"
-                params.append(min_price)
-            
-            if max_price is not None:
-                query += " AND price <= ?"
-                params.append(max_price)
-            
-            if availability:
-                query += " AND availability = ?"
-                params.append(availability)
-            
-            query += " ORDER BY name LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            products = [dict(row) for row in cursor.fetchall()]
-            
-            return products
+        conn = _request_conn()
+        cursor = conn.cursor()
+        
+        # Reuse the cached SQL text so sqlite3's statement cache hits
+        query = _products_stmt(
+            bool(session_id), bool(brand), min_price is not None,
+            max_price is not None, bool(availability)
+        )
+        params = []
+        if session_id:
+            params.append(session_id)
+        if brand:
+            params.append(f"%{brand}%")
+        if min_price is not None:
+            params.append(min_price)
+        if max_price is not None:
+            params.append(max_price)
+        if availability:
+            params.append(availability)
+        params.append(limit)
+        
+        # Tuple rows + one orjson pass instead of dict(row) and RESTX marshalling
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        products = _rows_to_dicts(cursor, _PRODUCT_CASTS, _PRODUCT_DEFAULTS)
+        if _wants_msgpack():
+            return _msgpack_response(products)
+        
+        body = orjson.dumps(products, default=str)
+        
+        return _json_bytes_response(body)
 
 @products_ns.route('/<int:product_id>')
 class Product(Resource):
@@ -336,15 +598,15 @@ class Product(Resource):
     @products_ns.marshal_with(product_model)
     def get(self, product_id):
         """Get specific product details"""
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
-            product = cursor.fetchone()
-            
-            if not product:
-                abort(404, description=f"Product {product_id} not found")
-            
-            return dict(product)
+        conn = _request_conn()
+        cursor = conn.cursor()
+        cursor.execute(_PRODUCT_BY_ID_SQL, (product_id,))
+        product = cursor.fetchone()
+        
+        if not product:
+            abort(404, description=f"Product {product_id} not found")
+        
+        return dict(product)
 
 @products_ns.route('/search')
 class ProductsSearch(Resource):
@@ -364,13 +626,11 @@ class ProductsSearch(Resource):
         
         if not session_id:
             # Use latest session if none specified
-            recent_sessions = db.get_recent_sessions(1)
-            if recent_sessions:
-                session_id = recent_sessions[0]['session_id']
-            else:
+            session_id = _get_latest_session_id()
+            if not session_id:
                 return {'total_results': 0, 'results': []}
         
-        results = db.search_products(session_id, query, limit)
+        results = db.search_products(session_id, query, limit, columns=_PRODUCT_COLUMNS)
         
         return {
             'total_results': len(results),
@@ -381,6 +641,7 @@ class ProductsSearch(Resource):
 @stats_ns.route('/database')
 class DatabaseStats(Resource):
     @stats_ns.doc('get_database_stats')
+    @cache.cached(query_string=True, unless=_wants_msgpack)
     @stats_ns.marshal_with(database_stats_model)
     def get(self):
         """Get overall database statistics"""
@@ -393,7 +654,7 @@ class SessionStats(Resource):
     @stats_ns.marshal_with(session_model)
     def get(self, session_id):
         """Get detailed statistics for a specific session"""
-        stats = db.get_session_stats(session_id)
+        stats = db.get_session_stats(session_id, columns=_SESSION_COLUMNS)
         if not stats:
             abort(404, description=f"Session {session_id} not found")
         return stats
@@ -401,126 +662,86 @@ class SessionStats(Resource):
 @stats_ns.route('/categories')
 class CategoryStats(Resource):
     @stats_ns.doc('get_category_stats')
+    @cache.cached(query_string=True, unless=_wants_msgpack)
     @stats_ns.param('session_id', 'Session ID (uses latest if not specified)', type=str)
     def get(self):
         """Get category statistics and counts"""
         session_id = request.args.get('session_id')
         
         if not session_id:
-            recent_sessions = db.get_recent_sessions(1)
-            if not recent_sessions:
+            session_id = _get_latest_session_id()
+            if not session_id:
                 return {}
-            session_id = recent_sessions[0]['session_id']
-        
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Category type distribution
-            cursor.execute("""
-                SELECT category_type, COUNT(*) as count
-                FROM categories 
-                WHERE session_id = ?
-                GROUP BY category_type
-            """, (session_id,))
-            
-            type_distribution = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            # Leaf vs non-leaf
-            cursor.execute("""
-                SELECT is_leaf, COUNT(*) as count
-                FROM categories 
-                WHERE session_id = ?
-                GROUP BY is_leaf
-            """, (session_id,))
-            
-            leaf_distribution = {
-                'leaf_categories': 0,
-                'navigation_categories': 0
-            }
-            
-            for is_leaf, count in cursor.fetchall():
-                if is_leaf:
-                    leaf_distribution['leaf_categories'] = count
-                else:
-                    leaf_distribution['navigation_categories'] = count
-            
-            # Category levels
-            cursor.execute("""
-                SELECT level, COUNT(*) as count
-                FROM categories 
+        
+        conn = _request_conn()
+        cursor = conn.cursor()
+        
+        # Type, leaf and level distributions in a single scan
+        cursor.execute("""
+            WITH c AS (
+                SELECT category_type, is_leaf, level
+                FROM categories
                 WHERE session_id = ?
-                GROUP BY level
-                ORDER BY level
-            """, (session_id,))
-            
-            level_distribution = {f"level_{row[0]}": row[1] for row in cursor.fetchall()}
-            
-            return {
-                'session_id': session_id,
-                'type_distribution': type_distribution,
-                'leaf_distribution': leaf_distribution,
-                'level_distribution': level_distribution
-            }
+            )
+            SELECT 'type', category_type, COUNT(*), NULL FROM c GROUP BY category_type
+            UNION ALL
+            SELECT 'leaf', NULL,
+                   COALESCE(SUM(CASE WHEN is_leaf THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN is_leaf THEN 0 ELSE 1 END), 0)
+            FROM c
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'level', level, COUNT(*), NULL FROM c GROUP BY level ORDER BY level
+            )
+        """, (session_id,))
+        
+        type_distribution = {}
+        leaf_distribution = {}
+        level_distribution = {}
+        
+        for kind, bucket, count, navigation_count in cursor.fetchall():
+            if kind == 'type':
+                type_distribution[bucket] = count
+            elif kind == 'leaf':
+                # Leaf/navigation split is pivoted in SQL into a single row
+                leaf_distribution = {
+                    'leaf_categories': count,
+                    'navigation_categories': navigation_count
+                }
+            else:
+                level_distribution[f"level_{bucket}"] = count
+        
+        return {
+            'session_id': session_id,
+            'type_distribution': type_distribution,
+            'leaf_distribution': leaf_distribution,
+            'level_distribution': level_distribution
+        }
 
 @stats_ns.route('/products')
 class ProductStats(Resource):
     @stats_ns.doc('get_product_stats')
+    @cache.cached(query_string=True, unless=_wants_msgpack)
     @stats_ns.param('session_id', 'Session ID (uses latest if not specified)', type=str)
     def get(self):
         """Get product statistics and pricing information"""
         session_id = request.args.get('session_id')
         
         if not session_id:
-            recent_sessions = db.get_recent_sessions(1)
-            if not recent_sessions:
+            session_id = _get_latest_session_id()
+            if not session_id:
                 return {}
-            session_id = recent_sessions[0]['session_id']
-        
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Price statistics
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_products,
-                    AVG(price) as avg_price,
-                    MIN(price) as min_price,
-                    MAX(price) as max_price,
-                    COUNT(CASE WHEN price IS NOT NULL THEN 1 END) as products_with_price
-                FROM products 
-                WHERE session_id = ?
-            """, (session_id,))
-            
-            price_stats = dict(cursor.fetchone())
-            
-            # Brand distribution (top 10)
-            cursor.execute("""
-                SELECT brand, COUNT(*) as count
-                FROM products 
-                WHERE session_id = ? AND brand IS NOT NULL
-                GROUP BY brand
-                ORDER BY count DESC
-                LIMIT 10
-            """, (session_id,))
-            
-            brand_distribution = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            # Availability distribution
-            cursor.execute("""
-                SELECT availability, COUNT(*) as count
-                FROM products 
-                WHERE session_id = ? AND availability IS NOT NULL
-                GROUP BY availability
-            """, (session_id,))
-            
-            availability_distribution = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            return {
-                'session_id': session_id,
-                'price_statistics': price_stats,
-                'top_brands': brand_distribution,
-                'availability_distribution': availability_distribution
-            }
+        
+        # Completed sessions have their stats precomputed as a JSON payload
+        cursor = _request_conn().cursor()
+        cursor.execute(
+            "SELECT payload FROM product_stats WHERE session_id = ?", (session_id,)
+        )
+        row = cursor.fetchone()
+        if row:
+            return _serve_json_bytes(row['payload'].encode())
+        
+        return db.get_product_stats(session_id)
 
 # Health check endpoint
 @system_ns.route('/health')
@@ -530,82 +751,88 @@ class Health(Resource):
         """API health check"""
         try:
             # Test database connection
-            stats = service.get_database_stats()
+            _ping_database()
             return {
                 'status': 'healthy',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _iso_now(),
                 'database': 'connected',
-                'total_sessions': stats.get('total_sessions', 0)
+                'total_sessions': _total_sessions()
             }
         except Exception as e:
             return {
                 'status': 'unhealthy',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _iso_now(),
                 'error': str(e)
             }, 500
 
 # Root endpoint
+# Constant payload, serialized once at import time
+_SYSTEM_INFO_BODY = orjson.dumps({
+    'name': 'Costco Database API',
+    'version': '1.0',
+    'description': 'Read-only REST API for accessing Costco scraping data',
+    'endpoints': {
+        'documentation': '/docs/',
+        'health': '/api/v1/system/health',
+        'sessions': '/api/v1/sessions',
+        'categories': '/api/v1/categories',
+        'products': '/api/v1/products',
+        'statistics': '/api/v1/stats'
+    }
+})
+
 @system_ns.route('/info')
 class Root(Resource):
     @system_ns.doc('api_info')
     def get(self):
         """API information and available endpoints"""
-        return {
-            'name': 'Costco Database API',
-            'version': '1.0',
-            'description': 'Read-only REST API for accessing Costco scraping data',
-            'endpoints': {
-                'documentation': '/docs/',
-                'health': '/api/v1/system/health',
-                'sessions': '/api/v1/sessions',
-                'categories': '/api/v1/categories',
-                'products': '/api/v1/products',
-                'statistics': '/api/v1/stats'
-            }
-        }
+        return _serve_json_bytes(_SYSTEM_INFO_BODY)
 
 # Add simple health route for easy testing
 @app.route('/health')
 def simple_health():
     """Simple health check route"""
     try:
-        stats = service.get_database_stats()
+        _ping_database()
         return jsonify({
             'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _iso_now(),
             'database': 'connected',
-            'total_sessions': stats.get('total_sessions', 0)
+            'total_sessions': _total_sessions()
         })
     except Exception as e:
         return jsonify({
             'status': 'unhealthy',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _iso_now(),
             'error': str(e)
         }), 500
 
+_ROOT_BODY = orjson.dumps({
+    'name': 'Costco Database API',
+    'version': '1.0',
+    'description': 'Read-only REST API for accessing Costco scraping data',
+    'documentation': '/docs/',
+    'health': '/health',
+    'endpoints': {
+        'sessions': '/api/v1/sessions',
+        'categories': '/api/v1/categories',
+        'products': '/api/v1/products',
+        'statistics': '/api/v1/stats',
+        'system': '/api/v1/system'
+    }
+})
+
 @app.route('/')
 def api_root():
     """Root API information"""
-    return jsonify({
-        'name': 'Costco Database API',
-        'version': '1.0',
-        'description': 'Read-only REST API for accessing Costco scraping data',
-        'documentation': '/docs/',
-        'health': '/health',
-        'endpoints': {
-            'sessions': '/api/v1/sessions',
-            'categories': '/api/v1/categories',
-            'products': '/api/v1/products',
-            'statistics': '/api/v1/stats',
-            'system': '/api/v1/system'
-        }
-    })
+    return _json_bytes_response(_ROOT_BODY)
 
 if __name__ == '__main__':
-    # Development server
+    # Development server; use wsgi.py with gunicorn in production
     port = 5001
+    debug = os.environ.get('FLASK_DEBUG') == '1'
     print("🚀 Starting Costco Database API...")
     print(f"📚 Swagger documentation available at: http://localhost:{port}/docs/")
     print(f"🏥 Health check available at: http://localhost:{port}/health")
     
-    app.run(debug=True, host='0.0.0.0', port=port)
+    app.run(debug=debug, host='0.0.0.0', port=port, threaded=True)
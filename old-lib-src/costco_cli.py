@@ -6,20 +6,38 @@ Command-line interface for managing the Costco database and running scraping ope
 """
 
 import argparse
-import json
+import functools
+import itertools
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from costco_service import CostcoService
-from costco_database import CostcoDatabase
+import orjson
 
+# Service/database modules pull in the scraper stack, so they are imported
+# lazily by the commands that need them; --help and usage errors stay fast
+if TYPE_CHECKING:
+    from costco_service import CostcoService
+
+# Category marker indexed by is_leaf (navigation, leaf)
+LEAF_EMOJI = ("📁", "🍃")
+
+# Non-interactive scrape runs report progress once per this many items
+PROGRESS_EVERY = 100
+
+# Session status markers; anything else (e.g. running) shows as in progress
+STATUS_EMOJI = {"completed": "✅", "failed": "❌"}
 
-def main():
-    parser = argparse.ArgumentParser(description="Costco Database CLI Tool")
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    # Scrape command
+@functools.lru_cache(maxsize=None)
+def get_service() -> "CostcoService":
+    """Create the CostcoService on first use so commands that don't need it skip its startup."""
+    from costco_service import CostcoService
+
+    return CostcoService()
+
+
+def _add_scrape_parser(subparsers):
     scrape_parser = subparsers.add_parser(
         "scrape", help="Run scraping with database storage"
     )
@@ -31,16 +49,23 @@ def main():
         "--no-ai", action="store_true", help="Disable AI extraction"
     )
 
-    # Database commands
+
+def _add_init_parser(subparsers):
     subparsers.add_parser("init", help="Initialize database")
+
+
+def _add_stats_parser(subparsers):
     subparsers.add_parser("stats", help="Show database statistics")
 
-    # Session commands
+
+def _add_sessions_parser(subparsers):
     sessions_parser = subparsers.add_parser("sessions", help="List recent sessions")
     sessions_parser.add_argument(
         "--limit", type=int, default=10, help="Number of sessions to show"
     )
 
+
+def _add_export_parser(subparsers):
     export_parser = subparsers.add_parser("export", help="Export session data")
     export_parser.add_argument(
         "session_id", nargs="?", help="Session ID to export (latest if not specified)"
@@ -49,24 +74,69 @@ def main():
         "--format", default="json", choices=["json"], help="Export format"
     )
 
-    # Search commands
+
+def _add_search_parser(subparsers):
     search_parser = subparsers.add_parser("search", help="Search products")
     search_parser.add_argument("query", help="Search query")
     search_parser.add_argument("--session", help="Session ID to search in")
 
-    # Cleanup commands
+
+def _add_cleanup_parser(subparsers):
     cleanup_parser = subparsers.add_parser("cleanup", help="Clean up old data")
     cleanup_parser.add_argument(
         "--days", type=int, default=30, help="Keep data from last N days"
     )
 
-    # Category commands
+
+def _add_categories_parser(subparsers):
     categories_parser = subparsers.add_parser("categories", help="Show categories")
     categories_parser.add_argument("session_id", nargs="?", help="Session ID")
     categories_parser.add_argument(
         "--hierarchy", action="store_true", help="Show full hierarchy"
     )
 
+
+# Subcommand name -> function registering its subparser, in help order
+COMMANDS = {
+    "scrape": _add_scrape_parser,
+    "init": _add_init_parser,
+    "stats": _add_stats_parser,
+    "sessions": _add_sessions_parser,
+    "export": _add_export_parser,
+    "search": _add_search_parser,
+    "cleanup": _add_cleanup_parser,
+    "categories": _add_categories_parser,
+}
+
+
+def build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Build the CLI argument parser.
+
+    Args:
+        command: Known subcommand to build exclusively; None builds every
+            subcommand so top-level help and unknown-command errors are complete
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(description="Costco Database CLI Tool")
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+
+    if command in COMMANDS:
+        COMMANDS[command](subparsers)
+    else:
+        for add_parser in COMMANDS.values():
+            add_parser(subparsers)
+
+    return parser
+
+
+def main():
+    # Only the invoked subcommand's arguments are registered
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    parser = build_parser(command)
+
     args = parser.parse_args()
 
     if not args.command:
@@ -74,20 +144,36 @@ def main():
         return
 
     try:
-        service = CostcoService()
-
         if args.command == "scrape":
             print("🚀 Starting Costco scraping with database storage...")
+            service = get_service()
 
             # Setup progress callbacks
-            def on_category(session_id, category):
-                print(
-                    f"  📁 Found category: {category.name} ({category.category_type.value})"
-                )
+            if sys.stdout.isatty():
+                # Interactive terminal: one line per item
+                def on_category(session_id, category):
+                    print(
+                        f"  📁 Found category: {category.name} ({category.category_type.value})"
+                    )
 
-            def on_product(session_id, product):
-                price = product.get("price", "N/A")
-                print(f"    🛍️  Found product: {product.get('name')} - ${price}")
+                def on_product(session_id, product):
+                    price = product.get("price", "N/A")
+                    print(f"    🛍️  Found product: {product.get('name')} - ${price}")
+
+            else:
+                # Piped/CI output: periodic totals instead of a line per item
+                category_count = itertools.count(1)
+                product_count = itertools.count(1)
+
+                def on_category(session_id, category):
+                    n = next(category_count)
+                    if n % PROGRESS_EVERY == 0:
+                        print(f"  📁 ...{n} categories")
+
+                def on_product(session_id, product):
+                    n = next(product_count)
+                    if n % PROGRESS_EVERY == 0:
+                        print(f"    🛍️  ...{n} products")
 
             service.on_category_found = on_category
             service.on_product_found = on_product
@@ -106,91 +192,98 @@ def main():
             service.end_scraping_session()
 
         elif args.command == "init":
+            from costco_database import CostcoDatabase
+
             print("🗄️  Initializing database...")
             db = CostcoDatabase()
             print("✅ Database initialized successfully")
 
         elif args.command == "stats":
+            service = get_service()
             stats = service.get_database_stats()
             print("📊 Database Statistics:")
-            print(json.dumps(stats, indent=2, default=str))
+            # orjson emits UTF-8 bytes; write them straight to the binary stream
+            sys.stdout.flush()
+            sys.stdout.buffer.write(
+                orjson.dumps(
+                    stats,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC,
+                    default=str,
+                )
+                + b"\n"
+            )
 
         elif args.command == "sessions":
+            service = get_service()
             sessions = service.db.get_recent_sessions(args.limit)
-            print(f"📅 Recent {len(sessions)} sessions:")
-            for session in sessions:
-                status_emoji = (
-                    "✅"
-                    if session["status"] == "completed"
-                    else "❌"
-                    if session["status"] == "failed"
-                    else "🔄"
-                )
-                print(f"  {status_emoji} {session['session_id']}")
-                print(f"     Started: {session['start_time']}")
-                print(
-                    f"     Categories: {session.get('categories_found', 0)}, Products: {session.get('products_found', 0)}"
-                )
-                print()
+            sys.stdout.write(f"📅 Recent {len(sessions)} sessions:\n")
+            sys.stdout.writelines(
+                f"  {STATUS_EMOJI.get(session['status'], '🔄')} {session['session_id']}\n"
+                f"     Started: {session['start_time']}\n"
+                f"     Categories: {session.get('categories_found', 0)}, Products: {session.get('products_found', 0)}\n\n"
+                for session in sessions
+            )
 
         elif args.command == "export":
+            service = get_service()
             if args.session_id:
                 export_file = service.export_session_data(args.session_id, args.format)
             else:
                 # Export latest session
-                sessions = service.db.get_recent_sessions(1)
-                if not sessions:
+                session_id = service.db.get_latest_session_id()
+                if not session_id:
                     print("❌ No sessions found to export")
                     return
-                export_file = service.export_session_data(
-                    sessions[0]["session_id"], args.format
-                )
+                export_file = service.export_session_data(session_id, args.format)
 
             print(f"📁 Data exported to: {export_file}")
 
         elif args.command == "search":
-            results = service.search_products(args.query, args.session)
-            print(f"🔍 Found {len(results)} products matching '{args.query}':")
-            for product in results[:10]:  # Limit to 10 results
+            service = get_service()
+            results = service.search_products(args.query, args.session, limit=10)
+            lines = [f"🔍 Found {len(results)} products matching '{args.query}':\n"]
+            for product in results:
                 price = f"${product['price']:.2f}" if product.get("price") else "N/A"
-                print(f"  🛍️  {product['name']} - {price}")
+                lines.append(f"  🛍️  {product['name']} - {price}\n")
                 if product.get("brand"):
-                    print(f"      Brand: {product['brand']}")
-                print()
+                    lines.append(f"      Brand: {product['brand']}\n")
+                lines.append("\n")
+            sys.stdout.write("".join(lines))
 
         elif args.command == "cleanup":
+            service = get_service()
             print(f"🧹 Cleaning up data older than {args.days} days...")
             service.cleanup_old_data(args.days)
             print("✅ Cleanup completed")
 
         elif args.command == "categories":
+            service = get_service()
             session_id = args.session_id
             if not session_id:
                 # Use latest session
-                sessions = service.db.get_recent_sessions(1)
-                if not sessions:
+                session_id = service.db.get_latest_session_id()
+                if not session_id:
                     print("❌ No sessions found")
                     return
-                session_id = sessions[0]["session_id"]
 
             if args.hierarchy:
                 categories = service.db.get_category_hierarchy(session_id)
-                print(f"🌳 Category hierarchy for session {session_id}:")
-                current_level = -1
+                lines = [f"🌳 Category hierarchy for session {session_id}:\n"]
+                max_level = max((cat["level"] for cat in categories), default=0)
+                indents = ["  " * level for level in range(max_level + 1)]
                 for cat in categories:
-                    if cat["level"] > current_level:
-                        current_level = cat["level"]
-                    indent = "  " * cat["level"]
-                    leaf_indicator = "🍃" if cat["is_leaf"] else "📁"
-                    print(
-                        f"{indent}{leaf_indicator} {cat['name']} ({cat['category_type']})"
+                    leaf = LEAF_EMOJI[bool(cat["is_leaf"])]
+                    lines.append(
+                        f"{indents[cat['level']]}{leaf} {cat['name']} ({cat['category_type']})\n"
                     )
+                sys.stdout.write("".join(lines))
             else:
                 categories = service.db.get_categories(session_id)
-                print(f"📁 Root categories for session {session_id}:")
+                lines = [f"📁 Root categories for session {session_id}:\n"]
                 for cat in categories:
-                    leaf_indicator = "🍃" if cat["is_leaf"] else "📁"
-                    print(f"  {leaf_indicator} {cat['name']} ({cat['category_type']})")
+                    leaf = LEAF_EMOJI[bool(cat["is_leaf"])]
+                    lines.append(f"  {leaf} {cat['name']} ({cat['category_type']})\n")
+                sys.stdout.write("".join(lines))
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -7,27 +7,106 @@ Handles SQLite database operations for storing categories, products, and relatio
 
 import sqlite3
 import json
+import queue
+import re
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from contextlib import contextmanager
 
 from category_interface import CategoryItem, CategoryType
 
 
+# Full-text index over product name/brand/description, kept in sync by triggers.
+# Applied on every startup (IF NOT EXISTS) so existing databases pick it up too.
+PRODUCTS_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, brand, description,
+    content='products', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, name, brand, description)
+    VALUES (new.id, new.name, new.brand, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, brand, description)
+    VALUES ('delete', old.id, old.name, old.brand, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, brand, description)
+    VALUES ('delete', old.id, old.name, old.brand, old.description);
+    INSERT INTO products_fts(rowid, name, brand, description)
+    VALUES (new.id, new.name, new.brand, new.description);
+END;
+"""
+
+# Precomputed ProductStats payloads, written when a session completes
+PRODUCT_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS product_stats (
+    session_id TEXT PRIMARY KEY,
+    payload JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES scraping_sessions(session_id) ON DELETE CASCADE
+);
+"""
+
+# Indexes added after the original schema; applied on every startup so databases
+# created before them pick them up too
+QUERY_INDEXES_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_categories_session_type
+    ON categories(session_id, category_type, is_leaf);
+CREATE INDEX IF NOT EXISTS idx_products_session_name ON products(session_id, name);
+"""
+
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_prefix_query(query: str) -> str:
+    """
+    Turn free-form user input into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix term, so FTS5 operators and punctuation in
+    the input are never interpreted and "macb pro" matches "MacBook Pro".
+
+    Args:
+        query: Raw search text
+
+    Returns:
+        MATCH expression, or an empty string if the input has no searchable words
+    """
+    return " ".join(f'"{token}"*' for token in _FTS_TOKEN_RE.findall(query))
+
+
 class CostcoDatabase:
     """SQLite database manager for Costco scraping data."""
 
-    def __init__(self, db_path: str = "db/costco.db"):
+    def __init__(self, db_path: str = "db/costco.db", pool_size: int = 4):
         """
         Initialize database connection.
 
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path to SQLite database file, or a "file:" URI such as
+                "file:name?mode=memory&cache=shared" for a shared in-memory database
+            pool_size: Maximum number of pooled SQLite connections
         """
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # URI filenames are handed to SQLite verbatim and have no folder to create
+        self._uri = str(db_path) if str(db_path).startswith("file:") else None
+        if self._uri is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool_size = pool_size
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._pool_lock = threading.Lock()
+        self._opened = 0
+        # Connection pinned by batch() for the calling thread, if any
+        self._batch = threading.local()
+        self.fts_enabled = False
         self._init_database()
 
     def _init_database(self):
@@ -53,16 +132,162 @@ class CostcoDatabase:
                 conn.executescript(schema_sql)
                 print(f"Initialized database at {self.db_path}")
 
-    @contextmanager
-    def get_connection(self):
-        """Get database connection with proper cleanup."""
-        conn = sqlite3.connect(self.db_path)
+            conn.executescript(PRODUCT_STATS_SCHEMA)
+            conn.executescript(QUERY_INDEXES_SCHEMA)
+            self.fts_enabled = self._ensure_products_fts(conn)
+
+    def _ensure_products_fts(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the products full-text index if missing, backfilling existing rows.
+
+        Args:
+            conn: Open database connection
+
+        Returns:
+            True if FTS5 search is available, False if SQLite lacks FTS5
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='products_fts'"
+        )
+        if cursor.fetchone():
+            return True
+
+        try:
+            conn.executescript(PRODUCTS_FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ FTS5 unavailable, product search will use LIKE scans: {e}")
+            return False
+
+        conn.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        conn.commit()
+        return True
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a new SQLite connection configured for pooled, multi-threaded use."""
+        if self._uri is not None:
+            conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign keys
+        # Let INSERT OR REPLACE fire delete triggers so products_fts stays in sync
+        conn.execute("PRAGMA recursive_triggers = ON")
+        conn.execute("PRAGMA journal_mode = WAL")  # Readers don't block the writer
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -65536")  # 64 MiB page cache
+        return conn
+
+    def acquire_connection(self) -> sqlite3.Connection:
+        """
+        Take a connection from the pool, opening a new one while below pool_size.
+
+        Blocks until a connection is released once the pool is exhausted.
+
+        Returns:
+            SQLite connection that must be handed back via release_connection()
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            if self._opened < self.pool_size:
+                self._opened += 1
+                open_new = True
+            else:
+                open_new = False
+
+        if open_new:
+            try:
+                return self._open_connection()
+            except Exception:
+                with self._pool_lock:
+                    self._opened -= 1
+                raise
+
+        return self._pool.get()
+
+    def release_connection(self, conn: sqlite3.Connection):
+        """
+        Return a connection to the pool, discarding any uncommitted transaction.
+
+        Args:
+            conn: Connection previously obtained from acquire_connection()
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        self._pool.put(conn)
+
+    @contextmanager
+    def get_connection(self):
+        """Get a pooled database connection with proper cleanup.
+
+        Inside batch() the calling thread's batch connection is reused instead.
+        """
+        conn = getattr(self._batch, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self.acquire_connection()
         try:
             yield conn
         finally:
+            self.release_connection(conn)
+
+    @contextmanager
+    def batch(self):
+        """Run this thread's writes in one transaction with a single commit.
+
+        Every save made inside the block shares one pooled connection and one
+        explicit BEGIN; the block commits on success and rolls back if it raises.
+        """
+        if getattr(self._batch, "conn", None) is not None:
+            yield
+            return
+        conn = self.acquire_connection()
+        self._batch.conn = conn
+        try:
+            conn.execute("BEGIN")
+            yield
+            conn.commit()
+        finally:
+            self._batch.conn = None
+            self.release_connection(conn)
+
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit conn unless it belongs to an open batch()."""
+        if conn is not getattr(self._batch, "conn", None):
+            conn.commit()
+
+    def close(self):
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
             conn.close()
+            with self._pool_lock:
+                self._opened -= 1
+
+    @staticmethod
+    def _projection(columns: Optional[Sequence[str]], alias: str = "") -> str:
+        """
+        Build a SELECT column list.
+
+        Args:
+            columns: Column names to select, or None for every column
+            alias: Optional table alias to qualify the columns with
+
+        Returns:
+            Comma-separated column list, or "*" when no columns are given
+        """
+        prefix = f"{alias}." if alias else ""
+        if not columns:
+            return f"{prefix}*"
+        return ", ".join(f"{prefix}{c}" for c in columns)
 
     def start_scraping_session(
         self, ai_enabled: bool = True, metadata: Optional[Dict] = None
@@ -87,7 +312,7 @@ class CostcoDatabase:
             """,
                 (session_id, ai_enabled, json.dumps(metadata or {})),
             )
-            conn.commit()
+            self._commit(conn)
 
         print(f"Started scraping session: {session_id}")
         return session_id
@@ -118,7 +343,22 @@ class CostcoDatabase:
             """,
                 (status, session_id, session_id, session_id),
             )
-            conn.commit()
+
+            if status == "completed":
+                # Session data is now immutable, so the stats can be served as-is
+                conn.execute(
+                    "INSERT OR REPLACE INTO product_stats (session_id, payload) VALUES (?, ?)",
+                    (
+                        session_id,
+                        json.dumps(
+                            self._product_stats(conn, session_id),
+                            separators=(",", ":"),
+                            ensure_ascii=False,
+                        ),
+                    ),
+                )
+
+            self._commit(conn)
 
         print(f"Ended scraping session {session_id} with status: {status}")
 
@@ -175,7 +415,7 @@ class CostcoDatabase:
             )
 
             category_id = cursor.lastrowid
-            conn.commit()
+            self._commit(conn)
 
             return category_id
 
@@ -224,7 +464,7 @@ class CostcoDatabase:
             )
 
             product_id = cursor.lastrowid
-            conn.commit()
+            self._commit(conn)
 
             return product_id
 
@@ -253,14 +493,17 @@ class CostcoDatabase:
             """,
                 (category_id, product_id, position, featured),
             )
-            conn.commit()
+            self._commit(conn)
 
-    def get_session_stats(self, session_id: str) -> Dict[str, Any]:
-        """Get statistics for a scraping session."""
+    def get_session_stats(
+        self, session_id: str, columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Get statistics for a scraping session, optionally limited to some columns."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT * FROM session_stats WHERE session_id = ?", (session_id,)
+                f"SELECT {self._projection(columns)} FROM session_stats WHERE session_id = ?",
+                (session_id,),
             )
             row = cursor.fetchone()
 
@@ -268,31 +511,116 @@ class CostcoDatabase:
                 return dict(row)
             return {}
 
+    def get_product_stats(self, session_id: str) -> Dict[str, Any]:
+        """
+        Compute price, top brand and availability statistics for a session.
+
+        Args:
+            session_id: Session to summarize
+
+        Returns:
+            Dictionary with session_id, price_statistics, top_brands and
+            availability_distribution
+        """
+        with self.get_connection() as conn:
+            return self._product_stats(conn, session_id)
+
+    @staticmethod
+    def _product_stats(conn: sqlite3.Connection, session_id: str) -> Dict[str, Any]:
+        """Run the single-pass product statistics query on an open connection."""
+        cursor = conn.cursor()
+
+        # Price summary, top 10 brands and availability in a single round-trip
+        cursor.execute(
+            """
+            WITH p AS (
+                SELECT brand, availability, price
+                FROM products
+                WHERE session_id = ?
+            )
+            SELECT 'price', NULL, COUNT(*), AVG(price), MIN(price), MAX(price),
+                   COUNT(CASE WHEN price IS NOT NULL THEN 1 END)
+            FROM p
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'brand', brand, COUNT(*) as count, NULL, NULL, NULL, NULL
+                FROM p
+                WHERE brand IS NOT NULL
+                GROUP BY brand
+                ORDER BY count DESC
+                LIMIT 10
+            )
+            UNION ALL
+            SELECT 'availability', availability, COUNT(*), NULL, NULL, NULL, NULL
+            FROM p
+            WHERE availability IS NOT NULL
+            GROUP BY availability
+        """,
+            (session_id,),
+        )
+
+        price_stats: Dict[str, Any] = {}
+        brand_distribution: Dict[str, int] = {}
+        availability_distribution: Dict[str, int] = {}
+
+        for row in cursor.fetchall():
+            kind, bucket, count, avg_price, min_price, max_price, with_price = row
+            if kind == "price":
+                price_stats = {
+                    "total_products": count,
+                    "avg_price": avg_price,
+                    "min_price": min_price,
+                    "max_price": max_price,
+                    "products_with_price": with_price,
+                }
+            elif kind == "brand":
+                brand_distribution[bucket] = count
+            else:
+                availability_distribution[bucket] = count
+
+        return {
+            "session_id": session_id,
+            "price_statistics": price_stats,
+            "top_brands": brand_distribution,
+            "availability_distribution": availability_distribution,
+        }
+
     def get_categories(
-        self, session_id: str, parent_id: Optional[int] = None
+        self,
+        session_id: str,
+        parent_id: Optional[int] = None,
+        category_type: Optional[str] = None,
+        is_leaf: Optional[bool] = None,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Get categories for a session, optionally filtered by parent."""
+        """Get categories for a session, optionally filtered by parent, type and leaf status."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            select = self._projection(columns)
 
             if parent_id is not None:
-                cursor.execute(
-                    """
-                    SELECT * FROM categories 
+                query = f"""
+                    SELECT {select} FROM categories 
                     WHERE session_id = ? AND parent_category_id = ?
-                    ORDER BY name
-                """,
-                    (session_id, parent_id),
-                )
+                """
+                params: List[Any] = [session_id, parent_id]
             else:
-                cursor.execute(
-                    """
-                    SELECT * FROM categories 
+                query = f"""
+                    SELECT {select} FROM categories 
                     WHERE session_id = ? AND parent_category_id IS NULL
-                    ORDER BY name
-                """,
-                    (session_id,),
-                )
+                """
+                params = [session_id]
+
+            if category_type:
+                query += " AND category_type = ?"
+                params.append(category_type)
+
+            if is_leaf is not None:
+                query += " AND is_leaf = ?"
+                params.append(is_leaf)
+
+            query += " ORDER BY name"
+            cursor.execute(query, params)
 
             return [dict(row) for row in cursor.fetchall()]
 
@@ -311,13 +639,30 @@ class CostcoDatabase:
 
             return [dict(row) for row in cursor.fetchall()]
 
-    def get_products_by_category(self, category_id: int) -> List[Dict[str, Any]]:
-        """Get all products in a category."""
+    def get_products_by_category(
+        self, category_id: int, columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all products in a category.
+
+        Args:
+            category_id: Category to list products for
+            columns: Product columns to select; when omitted every product column
+                plus the link's position and featured flag is returned
+
+        Returns:
+            List of product dictionaries ordered by position within the category
+        """
+        if columns:
+            select = self._projection(columns, alias="p")
+        else:
+            select = "p.*, cp.position, cp.featured"
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """
-                SELECT p.*, cp.position, cp.featured
+                f"""
+                SELECT {select}
                 FROM products p
                 JOIN category_products cp ON p.id = cp.product_id
                 WHERE cp.category_id = ?
@@ -329,39 +674,105 @@ class CostcoDatabase:
             return [dict(row) for row in cursor.fetchall()]
 
     def search_products(
-        self, session_id: str, query: str, limit: int = 50
+        self,
+        session_id: str,
+        query: str,
+        limit: int = 50,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Search products by name, brand, or description."""
+        """
+        Search products by name, brand, or description.
+
+        Uses the products_fts index with prefix matching on every word of the
+        query, ranked by BM25. Falls back to LIKE substring scans when FTS5 is
+        unavailable or the query has no searchable words.
+
+        Args:
+            session_id: Session to search within
+            query: Free-form search text
+            limit: Maximum number of results
+            columns: Product columns to select, or None for every column
+
+        Returns:
+            List of matching product dictionaries
+        """
+        match = fts_prefix_query(query) if self.fts_enabled else ""
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT * FROM products 
-                WHERE session_id = ? AND (
-                    name LIKE ? OR 
-                    brand LIKE ? OR 
-                    description LIKE ?
+
+            if match:
+                cursor.execute(
+                    f"""
+                    SELECT {self._projection(columns, alias="p")}
+                    FROM products_fts f
+                    JOIN products p ON p.id = f.rowid
+                    WHERE products_fts MATCH ? AND p.session_id = ?
+                    ORDER BY f.rank
+                    LIMIT ?
+                """,
+                    (match, session_id, limit),
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT {self._projection(columns)} FROM products 
+                    WHERE session_id = ? AND (
+                        name LIKE ? OR 
+                        brand LIKE ? OR 
+                        description LIKE ?
+                    )
+                    ORDER BY name
+                    LIMIT ?
+                """,
+                    (session_id, f"%{query}%", f"%{query}%", f"%{query}%", limit),
                 )
-                ORDER BY name
-                LIMIT ?
-            """,
-                (session_id, f"%{query}%", f"%{query}%", f"%{query}%", limit),
-            )
 
             return [dict(row) for row in cursor.fetchall()]
 
-    def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent scraping sessions."""
+    def get_latest_session_id(self) -> Optional[str]:
+        """
+        Get the ID of the most recently started scraping session.
+
+        Returns:
+            Session ID, or None if no sessions exist
+        """
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT session_id FROM scraping_sessions ORDER BY start_time DESC LIMIT 1"
+            ).fetchone()
+            return row[0] if row else None
+
+    def get_recent_sessions(
+        self,
+        limit: int = 10,
+        status: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get recent scraping sessions, optionally filtered by status."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT * FROM session_stats 
-                ORDER BY start_time DESC 
-                LIMIT ?
-            """,
-                (limit,),
-            )
+            select = self._projection(columns)
+
+            if status:
+                cursor.execute(
+                    f"""
+                    SELECT {select} FROM session_stats 
+                    WHERE status = ?
+                    ORDER BY start_time DESC 
+                    LIMIT ?
+                """,
+                    (status, limit),
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT {select} FROM session_stats 
+                    ORDER BY start_time DESC 
+                    LIMIT ?
+                """,
+                    (limit,),
+                )
 
             return [dict(row) for row in cursor.fetchall()]
 
@@ -407,7 +818,7 @@ class CostcoDatabase:
                     old_sessions,
                 )
 
-                conn.commit()
+                self._commit(conn)
                 print(f"Cleaned up {len(old_sessions)} old sessions")
 
 
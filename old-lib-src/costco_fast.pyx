@@ -0,0 +1,37 @@
+# cython: language_level=3
+"""
+Compiled helpers for the Costco web scraper's per-link parsing loops.
+
+Build in place with `make build-fast` (requires Cython). costco_web_scraper
+falls back to identical pure-Python implementations when this module has not
+been compiled.
+"""
+
+
+cpdef str clean_link(str href, str name, object skip_href_re):
+    """
+    Normalize a sitemap category link.
+
+    Args:
+        href: Stripped href attribute of the link
+        name: Stripped link text
+        skip_href_re: Compiled pattern of utility hrefs that are never
+            categories (costco_web_scraper._SKIP_HREF_RE)
+
+    Returns:
+        Site-relative (or absolute costco.ca) href, or None if the link is not
+        a category (empty, utility link, too-short name or external site)
+    """
+    cdef bint is_http
+
+    if not href or not name or len(name) < 3:
+        return None
+    if skip_href_re.search(href) is not None:
+        return None
+
+    if href.startswith("/"):
+        return href
+    is_http = href.startswith("http")
+    if is_http:
+        return href if "costco.ca" in href else None
+    return "/" + href.lstrip("/")
@@ -6,12 +6,13 @@ High-level service that encapsulates the Costco web scraper and database operati
 Provides a clean API for scraping and storing Costco data with callback integration.
 """
 
-import json
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable
 
+import orjson
+
 from costco_database import CostcoDatabase
 from category_interface import CategoryItem, CategoryType, validate_category_output
 from costco_web_scraper import CostcoWebScraper
@@ -86,6 +87,8 @@ class CostcoService:
     def end_scraping_session(self, status: str = "completed"):
         """End the current scraping session."""
         if self.current_session_id:
+            # Session output files must be on disk before the session closes
+            self.scraper.flush_writes()
             self.db.end_scraping_session(self.current_session_id, status)
             print(f"✅ Ended scraping session: {self.current_session_id}")
 
@@ -282,19 +285,17 @@ class CostcoService:
         }
 
     def search_products(
-        self, query: str, session_id: Optional[str] = None
+        self, query: str, session_id: Optional[str] = None, limit: int = 50
     ) -> List[Dict[str, Any]]:
-        """Search for products across sessions."""
+        """Search for products across sessions, returning at most limit results."""
         target_session = session_id or self.current_session_id
         if not target_session:
             # Search across all sessions
-            recent_sessions = self.db.get_recent_sessions(limit=1)
-            if recent_sessions:
-                target_session = recent_sessions[0]["session_id"]
-            else:
+            target_session = self.db.get_latest_session_id()
+            if not target_session:
                 return []
 
-        return self.db.search_products(target_session, query)
+        return self.db.search_products(target_session, query, limit)
 
     def export_session_data(
         self, session_id: Optional[str] = None, export_format: str = "json"
@@ -312,8 +313,14 @@ class CostcoService:
             export_file = (
                 self.output_folder / f"export_{target_session}_{timestamp}.json"
             )
-            with open(export_file, "w") as f:
-                json.dump(data, f, indent=2, default=str)
+            # orjson produces the UTF-8 bytes directly; write them in one call
+            export_file.write_bytes(
+                orjson.dumps(
+                    data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    default=str,
+                )
+            )
         else:
             raise ValueError(f"Unsupported export format: {export_format}")
 
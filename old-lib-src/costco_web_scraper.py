@@ -5,19 +5,35 @@ Handles category discovery, product listing, and systematic data storage.
 Features AI-powered neuromorphic ETL for intelligent HTML structure discovery.
 """
 
+import asyncio
+import atexit
+import hashlib
+import itertools
 import json
+import marshal
+import sys
 import time
 import random
 import re
 import os
-from datetime import datetime
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from lxml import html as lxml_html
 from pagent import Pagent
 
+# BeautifulSoup tree builder; lxml is a hard dependency for product parsing
+_BS_PARSER = "lxml"
+
 # Import the common category interface
 try:
     from category_interface import (
@@ -55,6 +71,387 @@ except ImportError:
     print("Install with: pip install google-generativeai")
 
 
+# Sitemap categories live in these containers; other subtrees are not built
+_CATEGORY_STRAINER = SoupStrainer(["div", "section", "ul", "ol"])
+
+# Product tile markers: data-testid prefix, its raw-HTML attribute form, and
+# the tile-set class name
+_PRODUCT_TILE_PREFIX = "ProductTile_"
+_PRODUCT_TILE_ATTR = f'data-testid="{_PRODUCT_TILE_PREFIX}'
+_PRODUCT_TILE_SET_CLASS = "product-tile-set"
+
+# Class names marking pagination and product-results containers on leaf pages
+_PAGINATION_CLASSES = frozenset({"pagination", "page-numbers", "pager", "slick-dots"})
+_RESULTS_AREA_CLASSES = frozenset({"product-list-container", "search-results"})
+
+# Leaf decisions remembered per scraper, least recently used evicted first
+_LEAF_CACHE_SIZE = 512
+
+# Saved leaf decisions: format/heuristics version (bump when detection
+# changes) and maximum age in seconds before a saved cache is discarded
+_LEAF_CACHE_VERSION = 1
+_LEAF_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+# Fetch result keys holding the page body, left out of per-category result lines
+_PAGE_BODY_KEYS = ("content", "content_bytes")
+
+# Buffer size for result files streamed to disk
+_WRITE_BUFFER_SIZE = 128 * 1024
+
+# Extractor-generation prompt, split around the page type hint and the page
+# HTML so only those two parts are formatted per call
+_EXTRACTOR_PROMPT_HEAD = """
+You are an expert Python developer creating data extraction functions for Costco.ca pages.
+
+CRITICAL: Use the STANDARDIZED CATEGORY INTERFACE for all category extractions:
+
+For categories.json, each category MUST use this exact structure:
+```json
+{
+    "name": "Category Display Name",
+    "url": "/relative-url-path", 
+    "category_type": "leaf_product|leaf_service|leaf_location|non_leaf_navigation|non_leaf_hub|unknown",
+    "description": "Brief description if available",
+    "parent_category": "Parent category name if applicable",
+    "subcategories": ["list", "of", "subcategory", "names"],
+    "is_leaf": true/false,
+    "metadata": {"additional": "data"}
+}
+```
+
+CATEGORY TYPE DEFINITIONS:
+- leaf_product: Contains actual products for purchase
+- leaf_service: Contains services (insurance, photo, travel, etc.)
+- leaf_location: Store locations/warehouses
+- non_leaf_navigation: Navigation to subcategories
+- non_leaf_hub: Hub page with mixed content
+- unknown: Cannot determine type
+
+PAGE TYPE: """
+_EXTRACTOR_PROMPT_MID = """
+
+Create a Python function that:
+1. Discovers ALL entities (products, categories, services, promotions, etc.)
+2. For CATEGORIES: Use the standardized interface above
+3. For OTHER entities: Use appropriate structures
+4. Saves each entity type to separate JSON files
+5. Returns dict with entities_found list and files_created list
+
+CRITICAL RETURN FORMAT:
+```python
+return {
+    "entities_found": ["categories", "products", "services"],  # List of ENTITY TYPE NAMES (strings)
+    "files_created": ["/path/to/categories.json", "/path/to/products.json"]  # List of file paths
+}
+```
+
+Requirements:
+- Function named `extract_data(html_bytes, output_folder=None)`, where html_bytes is
+  the page as UTF-8 encoded bytes
+- Use BeautifulSoup with the 'lxml' parser
+  (BeautifulSoup(html_bytes, 'lxml', from_encoding='utf-8'))
+- When only some elements are needed, pass parse_only=SoupStrainer(...) so the
+  rest of the page is never built into the soup
+- Do not wrap the function body in try/except; the caller handles exceptions,
+  so only guard individual optional fields that may be missing
+- Determine category_type based on URL patterns and context
+- Set is_leaf correctly based on category_type
+- entities_found must contain ONLY string names of entity types, NOT the actual objects
+- Only include entity types in entities_found if you actually found and saved data for them
+
+HTML to analyze:
+"""
+_EXTRACTOR_PROMPT_TAIL = """
+
+Return ONLY the complete Python function code, no explanations.
+"""
+
+# Page HTML characters included in the extractor-generation prompt
+_EXTRACTOR_HTML_CHARS = 20000
+
+# Generated extractor functions remembered per scraper, keyed by page structure
+_EXTRACTOR_CACHE_SIZE = 32
+
+# Version of the generated extractor contract (prompt, injected helpers and the
+# extract_data signature); bump on any change so cached extractors written for
+# the old contract are never loaded again
+_EXTRACTOR_CONTRACT_VERSION = 2
+
+# Leading elements of a page's main content whose (tag, class) pairs make up its
+# structural fingerprint, so pages built from one template share an extractor
+_EXTRACTOR_FINGERPRINT_ELEMENTS = 200
+
+# Creation timestamp (YYYYmmdd_HHMMSS) embedded in page request folder names
+_FOLDER_TIMESTAMP_RE = re.compile(r"\d{8}_\d{6}")
+
+
+def _folder_timestamp_key(folder_name: str) -> Tuple[str, str]:
+    """Sort key ordering page request folders by their embedded timestamp."""
+    match = _FOLDER_TIMESTAMP_RE.search(folder_name)
+    return (match.group() if match else "", folder_name)
+
+
+# Flags for replacing an output file with one complete buffer
+_REPLACE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """Replace a file with data through raw descriptor writes, skipping io buffering."""
+    fd = os.open(path, _REPLACE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+# Page type hints for extractor generation in priority order, each with the
+# lower-case keywords that indicate it
+_PAGE_TYPE_HINTS = (
+    (
+        "product_listing",
+        ("product-tile", "product-grid", "add-to-cart", "price", "buy-now"),
+    ),
+    (
+        "service_page",
+        ("insurance", "photo", "travel", "optical", "pharmacy", "gas"),
+    ),
+    (
+        "location_page",
+        ("warehouse", "store-hours", "address", "phone", "directions"),
+    ),
+    ("navigation_page", ("sitemap", "category", "department", "browse", "menu")),
+)
+
+# Log templates for full-site product scraping, formatted by the logger only
+# when a record is emitted
+_LOG_PROCESSING_CATEGORY = "🔄 Processing category %d/%d: %s"
+_LOG_LEAF_PAGE = "✅ LEAF page: Found %d products in '%s'"
+_LOG_NON_LEAF_PAGE = "🔗 NON-LEAF page: '%s' is a navigation page"
+_LOG_PRODUCTS_SUMMARY = """
+🎉 COMPREHENSIVE SCRAPING COMPLETE!
+📊 Summary:
+   • Categories processed: %d/%d
+   • Leaf pages (with products): %d
+   • Non-leaf pages (navigation): %d
+   • Total products found: %d
+   • Errors encountered: %d
+        """
+
+# Greedy JSON object extraction from free-form AI responses
+_JSON_OBJ_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Class-name fragments identifying category and product containers
+_CATEGORY_CLASS_RE = re.compile(r"category|department|section|nav", re.IGNORECASE)
+_PRODUCT_TERMS = ("product", "item", "tile", "card")
+
+# Footer/help/utility links that are never categories; also handed to the
+# compiled clean_link so both implementations share one pattern
+_SKIP_HREF_RE = re.compile(
+    r"javascript:|mailto:|#|help|contact|about|privacy|terms|sitemap|search",
+    re.IGNORECASE,
+)
+
+# Compiled link cleaning (make build-fast), with a pure-Python fallback
+try:
+    from costco_fast import clean_link
+except ImportError:
+
+    def clean_link(
+        href: str, name: str, skip_href_re: "re.Pattern[str]"
+    ) -> Optional[str]:
+        """
+        Normalize a sitemap category link.
+
+        Args:
+            href: Stripped href attribute of the link
+            name: Stripped link text
+            skip_href_re: Compiled pattern of utility hrefs (_SKIP_HREF_RE)
+
+        Returns:
+            Site-relative (or absolute costco.ca) href, or None if the link is
+            not a category (empty, utility link, too-short name or external site)
+        """
+        if not href or not name or len(name) < 3:
+            return None
+        if skip_href_re.search(href):
+            return None
+
+        if href.startswith("/"):
+            return href
+        if href.startswith("http"):
+            return href if "costco.ca" in href else None
+        return "/" + href.lstrip("/")
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate equivalent to the CSS class selector .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_LOWER_CLASS = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+# Product container patterns used by Costco, tried in order (first hit wins)
+_PRODUCT_XPATHS = [
+    (selector, etree.XPath(xpath))
+    for selector, xpath in (
+        # Product tiles, as counted by leaf detection
+        (
+            f'[data-testid^="{_PRODUCT_TILE_PREFIX}"]',
+            f".//*[starts-with(@data-testid, '{_PRODUCT_TILE_PREFIX}')]",
+        ),
+        # Common product tile selectors
+        (".product-tile", f".//*[{_has_class('product-tile')}]"),
+        (".product-item", f".//*[{_has_class('product-item')}]"),
+        (".product-card", f".//*[{_has_class('product-card')}]"),
+        (
+            '[data-automation-id*="product"]',
+            ".//*[contains(@data-automation-id, 'product')]",
+        ),
+        (".productTileContainer", f".//*[{_has_class('productTileContainer')}]"),
+        # Grid-based selectors
+        (
+            ".product-grid .product",
+            f".//*[{_has_class('product-grid')}]//*[{_has_class('product')}]",
+        ),
+        (
+            ".products-grid .product",
+            f".//*[{_has_class('products-grid')}]//*[{_has_class('product')}]",
+        ),
+        # Search result patterns
+        (
+            ".search-results .product",
+            f".//*[{_has_class('search-results')}]//*[{_has_class('product')}]",
+        ),
+        (".product-list-item", f".//*[{_has_class('product-list-item')}]"),
+    )
+]
+
+# Fallback: any div/article with a product-like class
+_PRODUCT_FALLBACK_XPATH = etree.XPath(
+    " | ".join(
+        f".//{tag}[contains({_LOWER_CLASS}, 'product') or contains({_LOWER_CLASS}, 'item')"
+        f" or contains({_LOWER_CLASS}, 'tile')]"
+        for tag in ("div", "article")
+    )
+)
+
+# Raw HTML window parsed for AI preprocessing; leaves headroom over the 50KB
+# output for markup stripped during cleaning
+_AI_PARSE_WINDOW = 300_000
+
+# Preprocessed HTML characters sent for AI leaf detection
+_AI_LEAF_SAMPLE_CHARS = 10000
+_MAIN_START_RE = re.compile(r"<main[\s>]", re.IGNORECASE)
+_BODY_START_RE = re.compile(r"<body[^>]*>", re.IGNORECASE)
+
+# Markup that costs Gemini tokens without describing products
+_AI_NOISE_ELEMENTS = ("script", "style", "noscript", "meta", "link", "svg", "iframe")
+_AI_NOISE_ATTRIBUTES = (
+    "style",
+    "srcset",
+    "onclick",
+    "onload",
+    "onerror",
+    "onchange",
+    "onsubmit",
+    "onfocus",
+    "onblur",
+    "onmouseover",
+    "onmouseout",
+    "data-analytics",
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Main content areas for AI preprocessing, tried in order (first hit wins)
+_MAIN_CONTENT_XPATHS = [
+    etree.XPath(f"(.//{xpath})[1]")
+    for xpath in (
+        "main",
+        f"*[{_has_class('main')}]",
+        "*[@id='main']",
+        f"*[{_has_class('content')}]",
+        "*[@id='content']",
+        f"*[{_has_class('products')}]",
+        f"*[{_has_class('product-list')}]",
+        f"*[{_has_class('product-grid')}]",
+        f"*[{_has_class('search-results')}]",
+        f"*[{_has_class('catalog')}]",
+        "section",
+        "article",
+    )
+]
+
+# Any element whose class mentions one of _PRODUCT_TERMS (case-insensitive)
+_PRODUCT_CONTAINER_XPATH = etree.XPath(
+    ".//*["
+    + " or ".join(f"contains({_LOWER_CLASS}, '{term}')" for term in _PRODUCT_TERMS)
+    + "]"
+)
+
+# Per-product field lookups; each walks the product subtree once and
+# candidates are taken in document order
+_NAME_XPATH = etree.XPath(
+    "(.//*["
+    + " or ".join(
+        (
+            _has_class("product-title"),
+            _has_class("product-name"),
+            "self::h3",
+            "self::h4",
+            "contains(@data-automation-id, 'product-title')",
+            f"self::a and ancestor::*[{_has_class('productTitleDescription')}]",
+        )
+    )
+    + "])[1]"
+)
+_PRICE_XPATH = etree.XPath(
+    ".//*["
+    + " or ".join(
+        (
+            _has_class("price"),
+            _has_class("product-price"),
+            _has_class("sale-price"),
+            "contains(@data-automation-id, 'price')",
+            # Sometimes price is in span after screen reader text
+            f"self::span and preceding-sibling::*[1][{_has_class('sr-only')}]",
+        )
+    )
+    + "]"
+)
+_LINK_XPATH = etree.XPath("(.//a[@href])[1]")
+_IMG_XPATH = etree.XPath("(.//img)[1]")
+
+
+def _element_text(element) -> str:
+    """Concatenated, stripped text of an element (like get_text(strip=True))"""
+    return "".join(text.strip() for text in element.itertext())
+
+
+# Product and image URLs are always joined against the same base, and tiles on a
+# page share CDN/image paths, so repeated (base, path) pairs skip URL parsing
+_cached_urljoin = lru_cache(maxsize=4096)(urljoin)
+
+
+def _iter_category_tree(categories: List[Dict]) -> Iterator[Dict]:
+    """
+    Yield every category of a nested category list, depth-first.
+
+    Args:
+        categories: Nested category structure
+
+    Yields:
+        Category dictionaries, each parent before its children
+    """
+    pending = deque(categories)
+    while pending:
+        category = pending.popleft()
+        yield category
+        # Children go to the front so the walk stays depth-first
+        pending.extendleft(reversed(category.get("children") or ()))
+
+
 class CostcoWebScraper:
     """
     A web scraper specifically designed for Costco.ca that wraps around Pagent
@@ -79,6 +476,50 @@ class CostcoWebScraper:
         self.categories = []
         self.categories_loaded = False
 
+        # Views over the category tree, rebuilt together by _rebuild_indexes when
+        # self.categories is reassigned: lowercase name -> category, and every
+        # category in depth-first order
+        self._category_index: Dict[str, Dict] = {}
+        self._flat_categories: List[Dict] = []
+        self._indexed_categories: Optional[List[Dict]] = None
+
+        # Gemini extraction results keyed by preprocessed-HTML hash
+        self.ai_cache_dir = self.pagent.db_folder / "ai_cache"
+
+        # Generated extractor sources keyed by page structure, and their bytecode
+        # keyed by source hash, so later runs skip generating and compiling again
+        self.extractor_code_dir = self.pagent.db_folder / "extractor_cache"
+
+        # Successful sitemap fetches for this scraper, keyed by base URL
+        self._sitemap_cache: Dict[str, Dict] = {}
+
+        # Suffix keeping request folders unique within the same second
+        self._request_seq = itertools.count()
+
+        # Leaf decisions keyed by page-content hash (see is_leaf)
+        self._leaf_cache: "OrderedDict[bytes, bool]" = OrderedDict()
+        self._leaf_cache_lock = threading.Lock()
+
+        # Generated extractor code keyed by page structure (see
+        # _structure_fingerprint)
+        self._extractor_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._extractor_cache_lock = threading.Lock()
+
+        # extract_data functions compiled from generated code, keyed by code hash
+        self._compiled_extractors: "OrderedDict[bytes, Optional[Callable]]" = (
+            OrderedDict()
+        )
+        self._compiled_extractors_lock = threading.Lock()
+
+        # Last page parsed on each thread, reused while the same content string
+        # is passed again (leaf detection, then product parsing); see _page_tree
+        self._parsed_page = threading.local()
+
+        # Output files (path, bytes, log message) saved off the scraping thread
+        self._write_queue: "queue.Queue[Tuple[Path, bytes, str]]" = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
         # AI-powered extraction setup
         self.ai_enabled = GEMINI_AVAILABLE and gemini_api_key
         if self.ai_enabled:
@@ -92,17 +533,46 @@ class CostcoWebScraper:
         else:
             self.pagent.logger.info("🔧 Using traditional extraction methods")
 
-    def fetch_sitemap(self) -> Dict:
+        # Leaf decisions from earlier runs; AI and static detection can disagree,
+        # so each mode keeps its own file
+        leaf_cache_name = "ai.json" if self.ai_enabled else "traditional.json"
+        self.leaf_cache_file = self.pagent.db_folder / "leaf_cache" / leaf_cache_name
+        self._leaf_cache_dirty = False
+        self._load_leaf_cache()
+        atexit.register(self.save_leaf_cache)
+
+    def _request_folder_name(self, prefix: str) -> str:
+        """
+        Build a timestamped, collision-free page request folder name.
+
+        Args:
+            prefix: Folder name prefix (e.g. sitemap, category_<name>)
+
+        Returns:
+            Folder name of the form <prefix>_<YYYYmmdd_HHMMSS>_<seq>
+        """
+        return (
+            f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{next(self._request_seq):06d}"
+        )
+
+    def fetch_sitemap(self, use_cache: bool = True) -> Dict:
         """
         Fetch the Costco sitemap page using standard page request strategy.
 
+        Args:
+            use_cache: Whether to reuse this scraper's earlier successful fetch
+
         Returns:
             Dict with fetch result including success status and content
         """
+        if use_cache and self.base_url in self._sitemap_cache:
+            self.pagent.logger.info("Using sitemap fetched earlier in this session")
+            return self._sitemap_cache[self.base_url]
+
         self.pagent.logger.info("Fetching Costco sitemap...")
 
         # Use standard timestamped folder name like all other page requests
-        folder_name = f"sitemap_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        folder_name = self._request_folder_name("sitemap")
 
         result = self.pagent.fetch_page(
             self.sitemap_url, method="auto", filename=folder_name
@@ -112,6 +582,7 @@ class CostcoWebScraper:
             self.pagent.logger.info(
                 f"Sitemap fetched successfully: {len(result['content'])} characters"
             )
+            self._sitemap_cache[self.base_url] = result
         else:
             self.pagent.logger.error(f"Failed to fetch sitemap: {result['error']}")
 
@@ -127,86 +598,66 @@ class CostcoWebScraper:
         Returns:
             List of category dictionaries with name, href, and children
         """
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = BeautifulSoup(
+            html_content, _BS_PARSER, parse_only=_CATEGORY_STRAINER
+        )
         categories = []
 
         self.pagent.logger.info("Parsing categories from sitemap...")
 
         # Find the main navigation structure
         # Look for common Costco sitemap patterns
-        category_sections = soup.find_all(
-            ["div", "section"],
-            class_=lambda x: x
-            and any(
-                term in x.lower()
-                for term in ["category", "department", "section", "nav"]
-            ),
-        )
+        category_sections = soup.find_all(["div", "section"], class_=_CATEGORY_CLASS_RE)
 
         if not category_sections:
             # Fallback: look for any structured lists with links
             category_sections = soup.find_all(["ul", "ol"])
 
+        # Duplicates (by href) are dropped as sections are parsed
+        seen_hrefs = set()
         for section in category_sections:
-            section_categories = self._parse_category_section(section)
-            if section_categories:
-                categories.extend(section_categories)
+            self._parse_category_section(section, categories, seen_hrefs)
 
-        # Remove duplicates based on href
-        seen_hrefs = set()
-        unique_categories = []
-        for cat in categories:
-            if cat["href"] not in seen_hrefs:
-                seen_hrefs.add(cat["href"])
-                unique_categories.append(cat)
+        self.pagent.logger.info(f"Found {len(categories)} unique categories")
+        return categories
 
-        self.pagent.logger.info(f"Found {len(unique_categories)} unique categories")
-        return unique_categories
+    def _parse_category_section(
+        self,
+        section,
+        categories: Optional[List[Dict]] = None,
+        seen_hrefs: Optional[set] = None,
+    ) -> List[Dict]:
+        """
+        Parse a single section for categories.
 
-    def _parse_category_section(self, section) -> List[Dict]:
-        """Parse a single section for categories."""
-        categories = []
+        Args:
+            section: Sitemap element to scan for category links
+            categories: Accumulator to append to (a new list if omitted)
+            seen_hrefs: Hrefs already collected; links matching one are skipped
+
+        Returns:
+            The categories accumulator
+        """
+        if categories is None:
+            categories = []
+        if seen_hrefs is None:
+            seen_hrefs = set()
 
         # Find all links in this section
         links = section.find_all("a", href=True)
 
         for link in links:
-            href = link.get("href", "").strip()
             name = link.get_text(strip=True)
 
-            # Filter out non-category links
-            if not href or not name:
+            # Filter out non-category links and normalize the rest to
+            # relative or absolute Costco URLs
+            href = clean_link(link.get("href", "").strip(), name, _SKIP_HREF_RE)
+            if href is None:
                 continue
 
-            # Skip unwanted links (footer, help, etc.)
-            if any(
-                skip in href.lower()
-                for skip in [
-                    "javascript:",
-                    "mailto:",
-                    "#",
-                    "help",
-                    "contact",
-                    "about",
-                    "privacy",
-                    "terms",
-                    "sitemap",
-                    "search",
-                ]
-            ):
+            if href in seen_hrefs:
                 continue
-
-            # Skip very short names that are likely not categories
-            if len(name) < 3:
-                continue
-
-            # Ensure href is relative or absolute Costco URL
-            if href.startswith("/"):
-                href = href
-            elif href.startswith("http") and "costco.ca" not in href:
-                continue
-            elif not href.startswith("http"):
-                href = "/" + href.lstrip("/")
+            seen_hrefs.add(href)
 
             category = {
                 "name": name,
@@ -270,7 +721,7 @@ class CostcoWebScraper:
                 return self.categories
 
         # Fetch fresh sitemap using page request strategy
-        sitemap_result = self.fetch_sitemap()
+        sitemap_result = self.fetch_sitemap(use_cache=use_cache)
 
         if not sitemap_result["success"]:
             raise Exception(f"Failed to fetch sitemap: {sitemap_result['error']}")
@@ -301,17 +752,38 @@ class CostcoWebScraper:
         if not self.categories_loaded:
             self.get_categories()
 
-        def search_categories(categories, name):
-            for category in categories:
-                if category["name"].lower() == name.lower():
-                    return category
-                if category.get("children"):
-                    found = search_categories(category["children"], name)
-                    if found:
-                        return found
-            return None
+        return self._get_category_index().get(category_name.lower())
+
+    def _get_category_index(self) -> Dict[str, Dict]:
+        """
+        Name index over the category tree. The first category in depth-first
+        order wins a name.
+
+        Returns:
+            Dict mapping lowercase category name to category dictionary
+        """
+        self._rebuild_indexes()
+        return self._category_index
+
+    def _rebuild_indexes(self):
+        """
+        Build every category view in one walk of self.categories, unless they
+        were already built from the same list. Leaf-status updates edit the
+        shared category dicts in place, so the views stay valid until
+        self.categories is reassigned.
+        """
+        if self._indexed_categories is self.categories:
+            return
+
+        index = {}
+        flat = []
+        for category in _iter_category_tree(self.categories):
+            flat.append(category)
+            index.setdefault(category["name"].lower(), category)
 
-        return search_categories(self.categories, category_name)
+        self._category_index = index
+        self._flat_categories = flat
+        self._indexed_categories = self.categories
 
     def fetch_category_page(self, category_name: str, **kwargs) -> Dict:
         """
@@ -332,7 +804,7 @@ class CostcoWebScraper:
 
         # Generate folder name for this category fetch
         safe_name = category_name.lower().replace(" ", "_").replace("&", "and")
-        folder_name = f"category_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        folder_name = self._request_folder_name(f"category_{safe_name}")
 
         self.pagent.logger.info(
             f"Fetching category page: {category_name} -> {category_url}"
@@ -382,11 +854,8 @@ class CostcoWebScraper:
             # Step 1: Preprocess HTML for AI analysis
             cleaned_html = self._preprocess_html_for_ai(html_content)
 
-            # Step 2: AI structure discovery
-            structure_analysis = self._ai_discover_structure(cleaned_html)
-
-            # Step 3: AI product extraction
-            products = self._ai_extract_products(cleaned_html, structure_analysis)
+            # Step 2: AI structure discovery and product extraction in one request
+            products = self._ai_extract_structure_and_products(cleaned_html)
 
             self.pagent.logger.info(f"🎯 AI extracted {len(products)} products")
             return products
@@ -396,195 +865,295 @@ class CostcoWebScraper:
             self.pagent.logger.info("🔄 Falling back to traditional extraction...")
             return self.parse_products(html_content)
 
-    def _preprocess_html_for_ai(self, html_content: str) -> str:
+    async def ai_extract_products_many(
+        self, html_docs: List[str], max_concurrency: int = 4
+    ) -> List[List[Dict]]:
         """
-        Preprocess HTML to make it more suitable for AI analysis.
-        Removes noise and focuses on content-rich sections.
+        AI product extraction for many pages with concurrent Gemini requests.
+
+        Args:
+            html_docs: Raw HTML content of each page
+            max_concurrency: Maximum number of Gemini requests in flight
+
+        Returns:
+            List of extracted product lists, in the same order as html_docs
         """
-        soup = BeautifulSoup(html_content, "html.parser")
+        if not self.ai_enabled:
+            return [self._traditional_parse_products(html) for html in html_docs]
 
-        # Remove script, style, and other noise elements
-        for element in soup(["script", "style", "noscript", "meta", "link"]):
-            element.decompose()
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-        # Remove comments
-        from bs4 import Comment
+        async def extract(html_content: str) -> List[Dict]:
+            cleaned_html = self._preprocess_html_for_ai(html_content)
+            cache_file = self._ai_cache_file(cleaned_html)
+            try:
+                extraction = self._load_ai_extraction(cache_file)
+                if extraction is None:
+                    prompt = self._build_ai_extraction_prompt(cleaned_html)
+                    async with semaphore:
+                        response = await self.gemini_model.generate_content_async(
+                            prompt
+                        )
+                    extraction = self._decode_ai_extraction(response.text)
+                    if extraction is None:
+                        return []
+                    self._store_ai_extraction(cache_file, extraction)
+                return self._validate_ai_extraction(extraction)
+            except Exception as e:
+                self.pagent.logger.error(f"💥 AI product extraction failed: {e}")
+                return self._traditional_parse_products(html_content)
 
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()
+        self.pagent.logger.info(
+            f"🤖 Extracting products from {len(html_docs)} pages with AI..."
+        )
+        return await asyncio.gather(*(extract(html) for html in html_docs))
 
-        # Focus on main content areas
-        main_content_selectors = [
-            "main",
-            ".main",
-            "#main",
-            ".content",
-            "#content",
-            ".products",
-            ".product-list",
-            ".product-grid",
-            ".search-results",
-            ".catalog",
-            "section",
-            "article",
-        ]
+    def _page_tree(self, html_content: str) -> lxml_html.HtmlElement:
+        """
+        Parse a page with lxml, reusing the tree from this thread's previous
+        call when it was given the same content string.
+
+        Args:
+            html_content: HTML content of the page
+
+        Returns:
+            Root element of the parsed page
+
+        Raises:
+            etree.ParserError, ValueError: If the page cannot be parsed
+        """
+        parsed = self._parsed_page
+        if getattr(parsed, "html", None) is not html_content:
+            parsed.tree = lxml_html.fromstring(html_content)
+            parsed.html = html_content
+        return parsed.tree
+
+    def _preprocess_html_for_ai(self, html_content: str) -> str:
+        """
+        Preprocess HTML for AI analysis (see _clean_html_for_ai). Leaf detection
+        and product extraction of the same page share one result per thread.
+        """
+        parsed = self._parsed_page
+        if getattr(parsed, "ai_html", None) is not html_content:
+            parsed.ai_cleaned = self._clean_html_for_ai(html_content)
+            parsed.ai_html = html_content
+        return parsed.ai_cleaned
 
+    def _clean_html_for_ai(self, html_content: str) -> str:
+        """
+        Preprocess HTML to make it more suitable for AI analysis.
+        Removes noise, focuses on content-rich sections and compacts the markup
+        to keep the prompt's token count down.
+        """
+        # Only parse the window the AI can see. It starts at <main> (the preferred
+        # content area) or <body>, so large headers and mega-menus don't use it up
+        if len(html_content) > _AI_PARSE_WINDOW:
+            start_match = _MAIN_START_RE.search(html_content) or _BODY_START_RE.search(
+                html_content
+            )
+            start = start_match.start() if start_match else 0
+            html_content = html_content[start : start + _AI_PARSE_WINDOW]
+
+        # Comments and whitespace-only text are dropped while parsing
+        parser = etree.HTMLParser(remove_comments=True, remove_blank_text=True)
+        try:
+            tree = etree.fromstring(html_content, parser)
+        except (etree.XMLSyntaxError, ValueError) as e:
+            self.pagent.logger.debug(f"Could not parse HTML for AI: {e}")
+            tree = None
+        if tree is None:
+            return html_content[:50000]
+
+        # Remove script, style, inline SVG and other noise elements/attributes
+        etree.strip_elements(tree, *_AI_NOISE_ELEMENTS, with_tail=False)
+        etree.strip_attributes(tree, *_AI_NOISE_ATTRIBUTES)
+
+        # Inlined base64 images are pure token cost
+        for img in tree.iter("img"):
+            if img.get("src", "").startswith("data:"):
+                img.set("src", "")
+
+        # Focus on main content areas
         main_content = None
-        for selector in main_content_selectors:
-            element = soup.select_one(selector)
-            if element:
-                main_content = element
+        for xpath in _MAIN_CONTENT_XPATHS:
+            found = xpath(tree)
+            if found:
+                main_content = found[0]
                 break
 
         # If no main content found, use body
-        if not main_content:
-            main_content = soup.find("body") or soup
-
-        # Return cleaned HTML limited to reasonable size for AI
-        cleaned = str(main_content)
+        if main_content is None:
+            main_content = tree.find("body")
+            if main_content is None:
+                main_content = tree
+
+        # Return cleaned HTML (whitespace runs collapsed) limited to reasonable
+        # size for AI
+        cleaned = _WHITESPACE_RE.sub(
+            " ",
+            etree.tostring(
+                main_content, encoding="unicode", method="html", with_tail=False
+            ),
+        )
         if len(cleaned) > 50000:  # Limit to 50KB for AI processing
             # Try to find product containers and limit to those
-            product_containers = main_content.find_all(
-                attrs={
-                    "class": lambda x: x
-                    and any(
-                        term in str(x).lower()
-                        for term in ["product", "item", "tile", "card"]
-                    )
-                }
-            )[:20]  # Limit to first 20 product containers
+            product_containers = _PRODUCT_CONTAINER_XPATH(main_content)[
+                :20
+            ]  # Limit to first 20 product containers
 
             if product_containers:
                 # Create a focused HTML with just product containers
-                focused_soup = BeautifulSoup("<div></div>", "html.parser")
+                focused = etree.Element("div")
                 for container in product_containers:
-                    focused_soup.div.append(container.extract())
-                cleaned = str(focused_soup)
+                    container.tail = None
+                    focused.append(container)
+                cleaned = _WHITESPACE_RE.sub(
+                    " ", etree.tostring(focused, encoding="unicode", method="html")
+                )
 
         return cleaned[:50000]  # Final safety limit
 
-    def _ai_discover_structure(self, html_content: str) -> Dict:
+    def _build_ai_extraction_prompt(self, html_content: str) -> str:
         """
-        Use AI to discover the structure of the HTML and identify product patterns.
+        Build the combined structure discovery + product extraction prompt.
         """
-        prompt = (
+        return (
             """
-You are an expert HTML structure analyzer. Analyze this HTML page and identify:
+You are an expert HTML structure analyzer and product data extractor. Analyze this HTML page and:
 
-1. Is this a product listing page? (Yes/No)
-2. What are the main product container patterns? (CSS selectors or element descriptions)
-3. What product information is available? (name, price, image, url, etc.)
-4. How are products organized in the HTML structure?
+1. Decide whether it is a product listing page
+2. Identify the main product container patterns (CSS selectors or element descriptions)
+3. Identify what product information is available (name, price, image, url, etc.)
+4. Extract ALL products found on the page
 
 Please respond in JSON format:
 {
-    "is_product_page": boolean,
-    "product_container_patterns": ["selector1", "selector2"],
-    "available_data_fields": ["name", "price", "image", "url"],
-    "structure_notes": "description of how products are organized"
+    "structure": {
+        "is_product_page": boolean,
+        "product_container_patterns": ["selector1", "selector2"],
+        "available_data_fields": ["name", "price", "image", "url"],
+        "structure_notes": "description of how products are organized"
+    },
+    "products": [
+        {
+            "name": "Product Name",
+            "price": "$X.XX",
+            "url": "relative or absolute URL",
+            "image_url": "image URL",
+            "product_id": "ID if available",
+            "description": "short description if available"
+        }
+    ]
 }
 
+Rules:
+1. Extract ALL products found on the page
+2. Use relative URLs for Costco.ca links
+3. Include price with currency symbol if available
+4. Set fields to null if not found
+5. Focus on actual products, not navigation items
+6. If this is not a product listing page, return an empty products list
+
 HTML to analyze:
 """
             + html_content
         )
 
-        try:
-            response = self.gemini_model.generate_content(prompt)
-
-            # Try to extract JSON from response
-            response_text = response.text
-            json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-
-            if json_match:
-                structure_data = json.loads(json_match.group())
-                self.pagent.logger.debug(f"🔍 AI Structure Analysis: {structure_data}")
-                return structure_data
-            else:
-                self.pagent.logger.warning("⚠️ AI response not in expected JSON format")
-                return {
-                    "is_product_page": False,
-                    "product_container_patterns": [],
-                    "available_data_fields": [],
-                }
-
-        except Exception as e:
-            self.pagent.logger.error(f"💥 AI structure discovery failed: {e}")
-            return {
-                "is_product_page": False,
-                "product_container_patterns": [],
-                "available_data_fields": [],
-            }
+    def _decode_ai_extraction(self, response_text: str) -> Optional[Dict]:
+        """
+        Pull the JSON object out of a combined extraction response.
+        """
+        json_match = _JSON_OBJ_RE.search(response_text)
+        if not json_match:
+            self.pagent.logger.warning(
+                "⚠️ AI product extraction response not in expected JSON format"
+            )
+            return None
+        return json.loads(json_match.group())
 
-    def _ai_extract_products(
-        self, html_content: str, structure_analysis: Dict
-    ) -> List[Dict]:
+    def _validate_ai_extraction(self, extraction: Dict) -> List[Dict]:
         """
-        Use AI to extract actual product data based on the discovered structure.
+        Validate and clean the products of a decoded extraction response.
         """
+        structure_analysis = extraction.get("structure") or {}
+        self.pagent.logger.debug(f"🔍 AI Structure Analysis: {structure_analysis}")
+
         if not structure_analysis.get("is_product_page", False):
             self.pagent.logger.info("🚫 AI determined this is not a product page")
             return []
 
-        prompt = (
-            f"""
-You are an expert product data extractor. Based on the structure analysis, extract ALL products from this HTML.
-
-Structure Analysis:
-{json.dumps(structure_analysis, indent=2)}
-
-Please extract products and return them in this JSON format:
-[
-    {{
-        "name": "Product Name",
-        "price": "$X.XX",
-        "url": "relative or absolute URL",
-        "image_url": "image URL",
-        "product_id": "ID if available",
-        "description": "short description if available"
-    }}
-]
-
-Rules:
-1. Extract ALL products found on the page
-2. Use relative URLs for Costco.ca links
-3. Include price with currency symbol if available
-4. Set fields to null if not found
-5. Focus on actual products, not navigation items
+        # Post-process and validate products in one pass; invalid ones clean to None
+        validated_products = list(
+            filter(
+                None,
+                map(
+                    self._clean_ai_extracted_product,
+                    [
+                        product
+                        for product in extraction.get("products") or []
+                        if isinstance(product, dict)
+                    ],
+                ),
+            )
+        )
 
-HTML to extract from:
-"""
-            + html_content
+        self.pagent.logger.info(
+            f"✅ AI extracted {len(validated_products)} valid products"
         )
+        return validated_products
 
+    def _ai_cache_file(self, cleaned_html: str) -> Path:
+        """
+        Cache file for the extraction of a preprocessed page. Pages rendered
+        from the same template hash to the same file.
+        """
+        key = hashlib.blake2b(cleaned_html.encode("utf-8"), digest_size=16)
+        return self.ai_cache_dir / f"{key.hexdigest()}.json"
+
+    def _load_ai_extraction(self, cache_file: Path) -> Optional[Dict]:
+        """
+        Load a cached extraction, or None on a cache miss.
+        """
         try:
-            response = self.gemini_model.generate_content(prompt)
-            response_text = response.text
+            with open(cache_file, "r", encoding="utf-8") as f:
+                extraction = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.pagent.logger.warning(f"⚠️ Ignoring unreadable AI cache file: {e}")
+            return None
 
-            # Try to extract JSON array from response
-            json_match = re.search(r"\[.*\]", response_text, re.DOTALL)
+        self.pagent.logger.debug(f"💾 AI cache hit: {cache_file.name}")
+        return extraction
 
-            if json_match:
-                products_data = json.loads(json_match.group())
+    def _store_ai_extraction(self, cache_file: Path, extraction: Dict):
+        """
+        Persist a decoded extraction so identical pages skip the Gemini call.
+        """
+        try:
+            self.ai_cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(extraction, f, ensure_ascii=False)
+        except OSError as e:
+            self.pagent.logger.warning(f"⚠️ Failed to write AI cache: {e}")
 
-                # Post-process and validate products
-                validated_products = []
-                for product in products_data:
-                    if isinstance(product, dict) and product.get("name"):
-                        # Clean and validate product data
-                        clean_product = self._clean_ai_extracted_product(product)
-                        if clean_product:
-                            validated_products.append(clean_product)
+    def _ai_extract_structure_and_products(self, html_content: str) -> List[Dict]:
+        """
+        Use AI to discover the page structure and extract its products in a
+        single request. Results are cached on disk by page content.
+        """
+        cache_file = self._ai_cache_file(html_content)
 
-                self.pagent.logger.info(
-                    f"✅ AI extracted {len(validated_products)} valid products"
-                )
-                return validated_products
-            else:
-                self.pagent.logger.warning(
-                    "⚠️ AI product extraction response not in expected JSON format"
-                )
-                return []
+        try:
+            extraction = self._load_ai_extraction(cache_file)
+            if extraction is None:
+                prompt = self._build_ai_extraction_prompt(html_content)
+                response = self.gemini_model.generate_content(prompt)
+                extraction = self._decode_ai_extraction(response.text)
+                if extraction is None:
+                    return []
+                self._store_ai_extraction(cache_file, extraction)
+            return self._validate_ai_extraction(extraction)
 
         except Exception as e:
             self.pagent.logger.error(f"💥 AI product extraction failed: {e}")
@@ -592,53 +1161,59 @@ HTML to extract from:
 
     def _clean_ai_extracted_product(self, product: Dict) -> Optional[Dict]:
         """
-        Clean and validate AI-extracted product data.
+        Clean and validate AI-extracted product data. Each field is read once
+        into a local. Products whose URLs cannot be joined to the base URL
+        (e.g. a malformed "//[..." IPv6 host) are dropped.
         """
-        try:
-            cleaned = {}
+        get = product.get
+        base_url = self.base_url
 
-            # Name is required
-            if not product.get("name") or not isinstance(product["name"], str):
-                return None
-            cleaned["name"] = product["name"].strip()
+        # Name is required
+        name = get("name")
+        if not name or not isinstance(name, str):
+            return None
+        cleaned = {"name": name.strip()}
 
-            # Clean price
-            price = product.get("price")
-            if price and isinstance(price, str):
-                cleaned["price"] = price.strip()
+        # Clean price
+        price = get("price")
+        if price and isinstance(price, str):
+            cleaned["price"] = price.strip()
 
+        try:
             # Clean URLs
-            url = product.get("url")
+            url = get("url")
             if url and isinstance(url, str):
                 url = url.strip()
                 if url.startswith("/"):
-                    cleaned["url"] = urljoin(self.base_url, url)
+                    cleaned["url"] = _cached_urljoin(base_url, url)
                 elif url.startswith("http"):
                     cleaned["url"] = url
                 elif url and not url.startswith(("javascript:", "mailto:", "#")):
-                    cleaned["url"] = urljoin(self.base_url, "/" + url.lstrip("/"))
+                    cleaned["url"] = _cached_urljoin(base_url, "/" + url.lstrip("/"))
 
             # Clean image URL
-            image_url = product.get("image_url")
+            image_url = get("image_url")
             if image_url and isinstance(image_url, str):
                 image_url = image_url.strip()
                 if image_url.startswith("/"):
-                    cleaned["image_url"] = urljoin(self.base_url, image_url)
+                    cleaned["image_url"] = _cached_urljoin(base_url, image_url)
                 elif image_url.startswith("http"):
                     cleaned["image_url"] = image_url
+        except ValueError as e:
+            # urljoin rejects malformed AI-returned URLs such as "//[bad/x"
+            self.pagent.logger.debug(f"⚠️ Failed to clean product: {e}")
+            return None
 
-            # Other fields
-            if product.get("product_id"):
-                cleaned["product_id"] = str(product["product_id"]).strip()
-
-            if product.get("description"):
-                cleaned["description"] = str(product["description"]).strip()
+        # Other fields
+        product_id = get("product_id")
+        if product_id:
+            cleaned["product_id"] = str(product_id).strip()
 
-            return cleaned
+        description = get("description")
+        if description:
+            cleaned["description"] = str(description).strip()
 
-        except Exception as e:
-            self.pagent.logger.debug(f"⚠️ Failed to clean product: {e}")
-            return None
+        return cleaned
 
     def ai_is_leaf_page(self, html_content: str) -> bool:
         """
@@ -648,8 +1223,11 @@ HTML to extract from:
             return self.is_leaf(html_content)
 
         try:
-            # Use a shorter sample for quick analysis
-            sample_html = self._preprocess_html_for_ai(html_content)[:10000]
+            # Use a shorter sample for quick analysis. Preprocessing only parses
+            # the _AI_PARSE_WINDOW slice and its result is reused for extraction
+            sample_html = self._preprocess_html_for_ai(html_content)[
+                :_AI_LEAF_SAMPLE_CHARS
+            ]
 
             prompt = f"""
 Analyze this HTML page and determine if it's a PRODUCT LISTING page or a NAVIGATION page.
@@ -707,30 +1285,20 @@ HTML to analyze:
         Returns:
             List of product dictionaries
         """
-        soup = BeautifulSoup(html_content, "html.parser")
         products = []
 
         self.pagent.logger.info("Parsing products from category page...")
 
-        # Try different product container patterns used by Costco
-        product_selectors = [
-            # Common product tile selectors
-            ".product-tile",
-            ".product-item",
-            ".product-card",
-            '[data-automation-id*="product"]',
-            ".productTileContainer",
-            # Grid-based selectors
-            ".product-grid .product",
-            ".products-grid .product",
-            # Search result patterns
-            ".search-results .product",
-            ".product-list-item",
-        ]
+        try:
+            tree = self._page_tree(html_content)
+        except (etree.ParserError, ValueError) as e:
+            self.pagent.logger.warning(f"Could not parse category page: {e}")
+            return products
 
+        # Try different product container patterns used by Costco
         product_elements = []
-        for selector in product_selectors:
-            elements = soup.select(selector)
+        for selector, xpath in _PRODUCT_XPATHS:
+            elements = xpath(tree)
             if elements:
                 product_elements = elements
                 self.pagent.logger.info(
@@ -740,11 +1308,7 @@ HTML to analyze:
 
         if not product_elements:
             # Fallback: look for any elements with product-like patterns
-            product_elements = soup.find_all(
-                ["div", "article"],
-                class_=lambda x: x
-                and any(term in x.lower() for term in ["product", "item", "tile"]),
-            )
+            product_elements = _PRODUCT_FALLBACK_XPATH(tree)
             self.pagent.logger.info(
                 f"Fallback: found {len(product_elements)} potential product elements"
             )
@@ -758,65 +1322,44 @@ HTML to analyze:
         return products
 
     def _parse_single_product(self, element) -> Optional[Dict]:
-        """Parse a single product element."""
+        """Parse a single product element (an lxml HtmlElement)."""
         try:
             product = {}
 
-            # Product name
-            name_selectors = [
-                ".product-title",
-                ".product-name",
-                "h3",
-                "h4",
-                '[data-automation-id*="product-title"]',
-                ".productTitleDescription a",
-            ]
+            # Resolve relative href/src attributes of this tile in one pass
+            element.make_links_absolute(self.base_url, handle_failures="ignore")
 
-            for selector in name_selectors:
-                name_elem = element.select_one(selector)
-                if name_elem:
-                    product["name"] = name_elem.get_text(strip=True)
-                    break
+            # Product name
+            name_elem = _NAME_XPATH(element)
+            if name_elem:
+                product["name"] = _element_text(name_elem[0])
 
-            # Product URL
-            link_elem = element.find("a", href=True)
+            # Product URL (non-http schemes such as javascript: are skipped)
+            link_elem = _LINK_XPATH(element)
             if link_elem:
-                href = link_elem.get("href")
-                if href:
-                    if href.startswith("/"):
-                        product["url"] = urljoin(self.base_url, href)
-                    elif href.startswith("http"):
-                        product["url"] = href
+                href = link_elem[0].get("href")
+                if href and href.startswith("http"):
+                    product["url"] = href
 
             # Price
-            price_selectors = [
-                ".price",
-                ".product-price",
-                ".sale-price",
-                '[data-automation-id*="price"]',
-                ".sr-only + span",  # Sometimes price is in span after screen reader text
-            ]
-
-            for selector in price_selectors:
-                price_elem = element.select_one(selector)
-                if price_elem:
-                    price_text = price_elem.get_text(strip=True)
-                    if "$" in price_text:
-                        product["price"] = price_text
-                        break
+            for price_elem in _PRICE_XPATH(element):
+                price_text = _element_text(price_elem)
+                if "$" in price_text:
+                    product["price"] = price_text
+                    break
 
             # Product ID (often in data attributes)
             product_id = element.get("data-product-id") or element.get("data-item-id")
             if product_id:
                 product["product_id"] = product_id
 
-            # Image URL
-            img_elem = element.find("img")
+            # Image URL (data-src is not rewritten by make_links_absolute)
+            img_elem = _IMG_XPATH(element)
             if img_elem:
-                img_src = img_elem.get("src") or img_elem.get("data-src")
+                img_src = img_elem[0].get("src") or img_elem[0].get("data-src")
                 if img_src:
                     if img_src.startswith("/"):
-                        product["image_url"] = urljoin(self.base_url, img_src)
+                        product["image_url"] = _cached_urljoin(self.base_url, img_src)
                     elif img_src.startswith("http"):
                         product["image_url"] = img_src
 
@@ -866,27 +1409,205 @@ HTML to analyze:
             products = []
             self.pagent.logger.info("Non-leaf page detected - no products to parse")
 
+        return self._category_products_result(
+            category_name, fetch_result, products, save_products
+        )
+
+    def _category_products_result(
+        self,
+        category_name: str,
+        fetch_result: Dict,
+        products: List[Dict],
+        save_products: bool,
+    ) -> Dict:
+        """
+        Build a get_products_by_category result, saving products if requested.
+
+        Args:
+            category_name: Name of the scraped category
+            fetch_result: Successful fetch result of the category page
+            products: Products parsed from the page
+            save_products: Whether to save products.json in the request folder;
+                the file is written in the background (see flush_writes)
+
+        Returns:
+            Dict with category info, fetch result, and parsed products
+        """
         result = {
             "category_name": category_name,
             "success": True,
             "fetch_result": fetch_result,
             "products": products,
             "product_count": len(products),
-            "is_leaf": is_leaf_page,
+            "is_leaf": fetch_result.get("is_leaf", False),
         }
 
-        # Save products to the same request folder
-        if save_products and fetch_result.get("request_folder"):
-            products_file = Path(fetch_result["request_folder"]) / "products.json"
-            try:
-                with open(products_file, "w", encoding="utf-8") as f:
-                    json.dump(products, f, indent=2, ensure_ascii=False)
-                self.pagent.logger.info(f"Products saved to: {products_file}")
-                result["products_file"] = str(products_file)
-            except Exception as e:
-                self.pagent.logger.warning(f"Failed to save products: {e}")
+        # Save products to the same request folder
+        if save_products and fetch_result.get("request_folder"):
+            products_file = Path(fetch_result["request_folder"]) / "products.json"
+            try:
+                self._write_file_async(
+                    products_file,
+                    orjson.dumps(
+                        products,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    ),
+                    f"Products saved to: {products_file}",
+                )
+                result["products_file"] = str(products_file)
+            except Exception as e:
+                self.pagent.logger.warning(f"Failed to save products: {e}")
+
+        return result
+
+    def _write_file_async(self, path: Path, data: bytes, message: str) -> None:
+        """
+        Queue an output file for the background writer thread.
+
+        Args:
+            path: File to (over)write
+            data: Complete file contents
+            message: Info log line emitted once the file is written
+        """
+        with self._writer_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._writer_loop, name="costco-writer", daemon=True
+                )
+                self._writer_thread.start()
+                # Daemon threads are still alive while atexit handlers run
+                atexit.register(self.flush_writes)
+        self._write_queue.put((path, data, message))
+
+    def _writer_loop(self) -> None:
+        """Write queued output files until close() queues the None sentinel."""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                self._write_queue.task_done()
+                return
+            path, data, message = item
+            try:
+                _write_bytes(path, data)
+                self.pagent.logger.info(message)
+            except Exception as e:
+                self.pagent.logger.warning(f"Failed to save {path}: {e}")
+            finally:
+                self._write_queue.task_done()
+
+    def flush_writes(self) -> None:
+        """Block until every queued output file has been written."""
+        self._write_queue.join()
+
+    def close(self) -> None:
+        """Finish pending writes, save leaf decisions and release the HTTP session."""
+        self.flush_writes()
+        with self._writer_lock:
+            if self._writer_thread is not None:
+                self._write_queue.put(None)
+                self._writer_thread.join()
+                self._writer_thread = None
+        self.save_leaf_cache()
+        # Drop the exit hooks so a closed scraper is not kept alive until exit
+        atexit.unregister(self.flush_writes)
+        atexit.unregister(self.save_leaf_cache)
+        self.pagent.session.close()
+
+    async def afetch_category_page(self, category_name: str, **kwargs) -> Dict:
+        """
+        Async fetch_category_page. The fetch and leaf analysis run in a worker
+        thread on Pagent's pooled session, leaving the event loop free.
+
+        Args:
+            category_name: Name of the category to fetch
+            **kwargs: Additional arguments for pagent.fetch_page
+
+        Returns:
+            Dict with fetch result
+        """
+        return await asyncio.to_thread(
+            self.fetch_category_page, category_name, **kwargs
+        )
+
+    async def aget_products_by_category(
+        self, category_name: str, save_products: bool = True, **fetch_kwargs
+    ) -> Dict:
+        """
+        Async get_products_by_category. AI extraction uses the async Gemini API.
+
+        Args:
+            category_name: Name of the category to scrape
+            save_products: Whether to save parsed products to JSON file
+            **fetch_kwargs: Additional arguments for page fetching
+
+        Returns:
+            Dict with category info, fetch result, and parsed products
+        """
+        fetch_result = await self.afetch_category_page(category_name, **fetch_kwargs)
+
+        if not fetch_result["success"]:
+            return {
+                "category_name": category_name,
+                "success": False,
+                "error": fetch_result["error"],
+                "products": [],
+            }
+
+        if fetch_result.get("is_leaf", False):
+            # ai_extract_products_many falls back to traditional parsing itself
+            products = (
+                await self.ai_extract_products_many([fetch_result["content"]])
+            )[0]
+            self.pagent.logger.info(f"Parsed {len(products)} products from leaf page")
+        else:
+            products = []
+            self.pagent.logger.info("Non-leaf page detected - no products to parse")
+
+        return await asyncio.to_thread(
+            self._category_products_result,
+            category_name,
+            fetch_result,
+            products,
+            save_products,
+        )
+
+    async def scrape_all(
+        self, category_names: List[str], concurrency: int = 16
+    ) -> List[Dict]:
+        """
+        Scrape products for many categories concurrently.
+
+        Args:
+            category_names: Names of the categories to scrape
+            concurrency: Maximum number of categories processed at once
+
+        Returns:
+            List of get_products_by_category results, in category_names order
+        """
+        # Load categories once up front so concurrent lookups don't race to fetch
+        if not self.categories_loaded:
+            await asyncio.to_thread(self.get_categories)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def scrape(category_name: str) -> Dict:
+            async with semaphore:
+                try:
+                    return await self.aget_products_by_category(category_name)
+                except Exception as e:
+                    self.pagent.logger.error(
+                        f"💥 Exception processing category '{category_name}': {e}"
+                    )
+                    return {
+                        "category_name": category_name,
+                        "success": False,
+                        "error": str(e),
+                        "products": [],
+                        "product_count": 0,
+                        "is_leaf": False,
+                    }
 
-        return result
+        return await asyncio.gather(*(scrape(name) for name in category_names))
 
     def fetch_product_page(self, product_url: str, **kwargs) -> Dict:
         """
@@ -904,7 +1625,7 @@ HTML to analyze:
         path_parts = parsed_url.path.strip("/").split("/")
         product_id = path_parts[-1] if path_parts else "unknown"
 
-        folder_name = f"product_{product_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        folder_name = self._request_folder_name(f"product_{product_id}")
 
         self.pagent.logger.info(f"Fetching product page: {product_url}")
 
@@ -925,22 +1646,23 @@ HTML to analyze:
 
         # Count different types of requests
         if self.pagent.page_requests_dir.exists():
-            request_folders = [
-                d for d in self.pagent.page_requests_dir.iterdir() if d.is_dir()
-            ]
-
             request_types = {"sitemap": 0, "category": 0, "product": 0, "other": 0}
 
-            for folder in request_folders:
-                folder_name = folder.name.lower()
-                if "sitemap" in folder_name:
-                    request_types["sitemap"] += 1
-                elif "category" in folder_name:
-                    request_types["category"] += 1
-                elif "product" in folder_name:
-                    request_types["product"] += 1
-                else:
-                    request_types["other"] += 1
+            # Folder names start with the prefix given by _request_folder_name;
+            # DirEntry.is_dir() reuses the type reported by the directory scan
+            with os.scandir(self.pagent.page_requests_dir) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    folder_name = entry.name
+                    if folder_name.startswith("sitemap_"):
+                        request_types["sitemap"] += 1
+                    elif folder_name.startswith("category_"):
+                        request_types["category"] += 1
+                    elif folder_name.startswith("product_"):
+                        request_types["product"] += 1
+                    else:
+                        request_types["other"] += 1
 
             stats["request_types"] = request_types
 
@@ -959,61 +1681,146 @@ HTML to analyze:
             True if the page is a leaf page (contains product listings),
             False if it's a non-leaf page (subcategory navigation)
         """
+        key = hashlib.blake2b(html_content.encode("utf-8"), digest_size=16).digest()
+        with self._leaf_cache_lock:
+            cached = self._leaf_cache.get(key)
+            if cached is not None:
+                self._leaf_cache.move_to_end(key)
+                return cached
+
         if self.ai_enabled:
-            return self.ai_is_leaf_page(html_content)
+            leaf = self.ai_is_leaf_page(html_content)
         else:
-            return self._traditional_is_leaf(html_content)
+            leaf = self._traditional_is_leaf(html_content)
 
-    def _traditional_is_leaf(self, html_content: str) -> bool:
+        # Worker threads (scrape_all, get_all_products_for_all_categories) share it
+        with self._leaf_cache_lock:
+            self._leaf_cache[key] = leaf
+            if len(self._leaf_cache) > _LEAF_CACHE_SIZE:
+                self._leaf_cache.popitem(last=False)
+            self._leaf_cache_dirty = True
+        return leaf
+
+    def _load_leaf_cache(self):
         """
-        Traditional leaf page detection using static patterns (fallback method).
+        Seed the leaf cache from leaf_cache_file unless it is missing, from
+        another cache version or older than _LEAF_CACHE_MAX_AGE. Keys are
+        page-content hashes, so a changed page never matches a saved entry.
         """
-        soup = BeautifulSoup(html_content, "html.parser")
+        try:
+            data = orjson.loads(self.leaf_cache_file.read_bytes())
+        except FileNotFoundError:
+            return
+        except (OSError, orjson.JSONDecodeError) as e:
+            self.pagent.logger.warning(f"⚠️ Ignoring unreadable leaf cache: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != _LEAF_CACHE_VERSION:
+            return
+        if time.time() - data.get("saved_at", 0) > _LEAF_CACHE_MAX_AGE:
+            self.pagent.logger.debug("Saved leaf cache expired")
+            return
+
+        # Entries are saved least recently used first; keep the newest
+        entries = list((data.get("leaf") or {}).items())[-_LEAF_CACHE_SIZE:]
+        for key, leaf in entries:
+            try:
+                self._leaf_cache[bytes.fromhex(key)] = bool(leaf)
+            except ValueError:
+                continue
+        self.pagent.logger.debug(f"💾 Loaded {len(self._leaf_cache)} leaf decisions")
 
-        # Count product tiles with data-testid="ProductTile_" pattern (strongest indicator)
-        product_tiles = soup.find_all(
-            attrs={"data-testid": lambda x: x and x.startswith("ProductTile_")}
-        )
+    def save_leaf_cache(self):
+        """
+        Save leaf decisions to leaf_cache_file for later runs. Called by close()
+        and at interpreter exit; does nothing if no decision changed.
+        """
+        with self._leaf_cache_lock:
+            if not self._leaf_cache_dirty:
+                return
+            entries = {key.hex(): leaf for key, leaf in self._leaf_cache.items()}
+            self._leaf_cache_dirty = False
 
-        # Count product tile sets (could be featured products or actual listings)
-        product_tile_sets = soup.select(".product-tile-set")
+        try:
+            self.leaf_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.leaf_cache_file.write_bytes(
+                orjson.dumps(
+                    {
+                        "version": _LEAF_CACHE_VERSION,
+                        "saved_at": time.time(),
+                        "leaf": entries,
+                    }
+                )
+            )
+        except OSError as e:
+            self.pagent.logger.warning(f"⚠️ Failed to save leaf cache: {e}")
 
-        # Look for pagination (very strong indicator of product listings)
-        pagination_elements = soup.select(
-            ".pagination, .page-numbers, .pager, .slick-dots"
-        )
+    def _traditional_is_leaf(self, html_content: str) -> bool:
+        """
+        Traditional leaf page detection using static patterns (fallback method).
+        """
+        # Most pages are decided by substring counts alone; only the ambiguous
+        # band (a few tiles, or many tile sets) needs the parsed tree below
+        if html_content.count(_PRODUCT_TILE_ATTR) >= 20:
+            self.pagent.logger.debug(
+                "Many ProductTile_ elements found - definitely a leaf page"
+            )
+            return True
+        if (
+            _PRODUCT_TILE_PREFIX not in html_content
+            and html_content.count(_PRODUCT_TILE_SET_CLASS) < 10
+        ):
+            self.pagent.logger.debug("No ProductTile_ elements - non-leaf page")
+            return False
 
-        # Look for product count/results indicators
-        product_count_elements = soup.select(
-            "[class*='product-count'], [class*='results-count'], [class*='showing']"
-        )
+        try:
+            tree = self._page_tree(html_content)
+        except (etree.ParserError, ValueError) as e:
+            self.pagent.logger.debug(f"Could not parse page for leaf detection: {e}")
+            return False
 
-        # Look for main content areas that suggest product listings
-        main_product_areas = soup.select(
-            "#product-results, .product-list-container, .search-results"
-        )
+        # One walk over the tree collects every signal:
+        # - ProductTile_ data-testid elements (strongest indicator)
+        # - product tile sets (could be featured products or actual listings)
+        # - pagination (very strong indicator of product listings)
+        # - main content areas that suggest product listings
+        product_tiles = product_tile_sets = pagination_elements = 0
+        main_product_areas = 0
+        for element in tree.iter(etree.Element):
+            attrs = element.attrib
+            if attrs.get("data-testid", "").startswith(_PRODUCT_TILE_PREFIX):
+                product_tiles += 1
+                if product_tiles >= 20:
+                    self.pagent.logger.debug(
+                        "Many ProductTile_ elements found - definitely a leaf page"
+                    )
+                    return True
+            classes = attrs.get("class", "").split()
+            if _PRODUCT_TILE_SET_CLASS in classes:
+                product_tile_sets += 1
+            if not _PAGINATION_CLASSES.isdisjoint(classes):
+                pagination_elements += 1
+            if attrs.get("id") == "product-results":
+                main_product_areas += 1
+            elif not _RESULTS_AREA_CLASSES.isdisjoint(classes):
+                main_product_areas += 1
 
         # Log for debugging
-        self.pagent.logger.debug(f"ProductTile_ elements: {len(product_tiles)}")
-        self.pagent.logger.debug(f"Product tile sets: {len(product_tile_sets)}")
-        self.pagent.logger.debug(f"Pagination elements: {len(pagination_elements)}")
-        self.pagent.logger.debug(f"Main product areas: {len(main_product_areas)}")
+        self.pagent.logger.debug("ProductTile_ elements: %d", product_tiles)
+        self.pagent.logger.debug("Product tile sets: %d", product_tile_sets)
+        self.pagent.logger.debug("Pagination elements: %d", pagination_elements)
+        self.pagent.logger.debug("Main product areas: %d", main_product_areas)
 
-        # Primary decision: Many ProductTile_ elements indicate a leaf page
-        if len(product_tiles) >= 20:
-            self.pagent.logger.debug(
-                "Many ProductTile_ elements found - definitely a leaf page"
-            )
-            return True
-        elif len(product_tiles) >= 10:
+        # Primary decision: 20+ ProductTile_ elements already returned above
+        if product_tiles >= 10:
             self.pagent.logger.debug(
                 "Moderate ProductTile_ elements found - likely a leaf page"
             )
             return True
-        elif len(product_tiles) >= 5:
+        elif product_tiles >= 5:
             # Could be leaf with few products or non-leaf with featured products
             # Check for other strong indicators
-            if len(pagination_elements) > 0 or len(main_product_areas) > 0:
+            if pagination_elements > 0 or main_product_areas > 0:
                 self.pagent.logger.debug(
                     "Few ProductTile_ but has pagination/main areas - leaf page"
                 )
@@ -1025,7 +1832,7 @@ HTML to analyze:
                 return False
         else:
             # Very few or no ProductTile_ elements
-            if len(product_tile_sets) >= 10 and len(pagination_elements) > 0:
+            if product_tile_sets >= 10 and pagination_elements > 0:
                 self.pagent.logger.debug(
                     "Many product tile sets with pagination - leaf page"
                 )
@@ -1047,38 +1854,28 @@ HTML to analyze:
         Returns:
             True if category was found and updated, False otherwise
         """
-
-        def update_in_categories(categories, name, leaf_status):
-            for category in categories:
-                if category["name"].lower() == name.lower():
-                    if leaf_status is None:
-                        # Fetch and determine leaf status
-                        try:
-                            fetch_result = self.fetch_category_page(name)
-                            if fetch_result["success"]:
-                                leaf_status = fetch_result.get("is_leaf", False)
-                            else:
-                                leaf_status = (
-                                    False  # Default to non-leaf if fetch fails
-                                )
-                        except Exception as e:
-                            self.pagent.logger.warning(
-                                f"Failed to determine leaf status for {name}: {e}"
-                            )
-                            leaf_status = False
-
-                    category["is_leaf"] = leaf_status
-                    category["leaf_status"] = "leaf" if leaf_status else "non-leaf"
-                    category["is_leaf_determined"] = True
-                    return True
-
-                # Check children recursively
-                if category.get("children"):
-                    if update_in_categories(category["children"], name, leaf_status):
-                        return True
+        category = self._get_category_index().get(category_name.lower())
+        if category is None:
             return False
 
-        return update_in_categories(self.categories, category_name, is_leaf)
+        if is_leaf is None:
+            # Fetch and determine leaf status
+            try:
+                fetch_result = self.fetch_category_page(category_name)
+                if fetch_result["success"]:
+                    is_leaf = fetch_result.get("is_leaf", False)
+                else:
+                    is_leaf = False  # Default to non-leaf if fetch fails
+            except Exception as e:
+                self.pagent.logger.warning(
+                    f"Failed to determine leaf status for {category_name}: {e}"
+                )
+                is_leaf = False
+
+        category["is_leaf"] = is_leaf
+        category["leaf_status"] = "leaf" if is_leaf else "non-leaf"
+        category["is_leaf_determined"] = True
+        return True
 
     def mark_h2_categories_as_non_leaf(self) -> int:
         """
@@ -1108,25 +1905,28 @@ HTML to analyze:
         Returns:
             List of categories with unknown leaf status
         """
-        unknown_categories = []
-
-        def collect_unknown(categories):
-            for category in categories:
-                if (
-                    not category.get("is_leaf_determined", False)
-                    and category.get("is_leaf") is None
-                ):
-                    unknown_categories.append(category)
+        return list(self.iter_unknown_leaf_categories())
 
-                # Check children recursively
-                if category.get("children"):
-                    collect_unknown(category["children"])
+    def iter_unknown_leaf_categories(self) -> Iterator[Dict]:
+        """
+        Yield categories without a determined leaf status, depth-first.
 
-        collect_unknown(self.categories)
-        return unknown_categories
+        Yields:
+            Categories with unknown leaf status
+        """
+        self._rebuild_indexes()
+        for category in self._flat_categories:
+            if (
+                not category.get("is_leaf_determined", False)
+                and category.get("is_leaf") is None
+            ):
+                yield category
 
     def get_all_products_for_all_categories(
-        self, max_categories: int = None, delay_between_requests: float = 1.0
+        self,
+        max_categories: int = None,
+        delay_between_requests: float = 1.0,
+        max_workers: int = 4,
     ) -> Dict:
         """
         Get all products for all categories using the leaf detection strategy.
@@ -1139,10 +1939,13 @@ HTML to analyze:
 
         Args:
             max_categories: Maximum number of categories to process (for testing/limiting)
-            delay_between_requests: Delay in seconds between requests to be respectful
+            delay_between_requests: Delay in seconds between request starts to be
+                respectful, enforced across all workers
+            max_workers: Number of categories fetched concurrently
 
         Returns:
-            Dict with comprehensive results including all products found
+            Dict with summary counters; per-category results (without page HTML)
+            are streamed to the JSONL file at results_path, see iter_results
         """
         self.pagent.logger.info(
             "🚀 Starting comprehensive product scraping for all categories..."
@@ -1156,7 +1959,7 @@ HTML to analyze:
                 "error": "No categories found",
                 "categories_processed": 0,
                 "total_products": 0,
-                "results": [],
+                "results_path": None,
             }
 
         # Flatten all categories (including subcategories) into a single list
@@ -1165,72 +1968,96 @@ HTML to analyze:
         if max_categories:
             all_categories = all_categories[:max_categories]
             self.pagent.logger.info(
-                f"🔍 Limited to processing {max_categories} categories for testing"
+                "🔍 Limited to processing %d categories for testing", max_categories
             )
 
+        total_categories = len(all_categories)
         self.pagent.logger.info(
-            f"📋 Found {len(all_categories)} total categories to process"
+            "📋 Found %d total categories to process", total_categories
         )
 
-        results = []
+        results_path = self._results_path("all_products")
         total_products = 0
         categories_processed = 0
         leaf_pages_found = 0
         non_leaf_pages_found = 0
         errors = []
 
-        for i, category in enumerate(all_categories):
-            category_name = category["name"]
+        # Request starts are spaced delay_between_requests apart across workers
+        pacing_lock = threading.Lock()
+        next_start = time.monotonic()
+
+        def scrape(i: int, category_name: str) -> Dict:
+            nonlocal next_start
             self.pagent.logger.info(
-                f"🔄 Processing category {i+1}/{len(all_categories)}: {category_name}"
+                _LOG_PROCESSING_CATEGORY, i + 1, total_categories, category_name
             )
 
-            try:
-                # Add delay between requests to be respectful
-                if i > 0 and delay_between_requests > 0:
-                    time.sleep(delay_between_requests)
+            # Add delay between requests to be respectful
+            with pacing_lock:
+                now = time.monotonic()
+                wait = next_start - now
+                next_start = max(next_start, now) + delay_between_requests
+            if wait > 0:
+                time.sleep(wait)
+
+            return self.get_products_by_category(category_name)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, open(
+            results_path, "wb", buffering=_WRITE_BUFFER_SIZE
+        ) as results_file:
+            futures = {
+                executor.submit(scrape, i, category["name"]): i
+                for i, category in enumerate(all_categories)
+            }
 
-                # Scrape this category
-                result = self.get_products_by_category(category_name)
+            # Lines finished ahead of an earlier category wait here so the JSONL
+            # file keeps the category order
+            pending_lines: Dict[int, bytes] = {}
+            next_line = 0
 
-                if result["success"]:
-                    categories_processed += 1
+            # Leaf-status updates and tallies stay on this thread
+            for future in as_completed(futures):
+                i = futures[future]
+                category_name = all_categories[i]["name"]
 
-                    if result["is_leaf"]:
-                        leaf_pages_found += 1
-                        product_count = result["product_count"]
-                        total_products += product_count
+                try:
+                    result = future.result()
 
-                        self.pagent.logger.info(
-                            f"✅ LEAF page: Found {product_count} products in '{category_name}'"
-                        )
+                    if result["success"]:
+                        categories_processed += 1
 
-                        # Update category status in our data structure
-                        self.update_category_leaf_status(category_name, True)
-                    else:
-                        non_leaf_pages_found += 1
-                        self.pagent.logger.info(
-                            f"🔗 NON-LEAF page: '{category_name}' is a navigation page"
-                        )
+                        if result["is_leaf"]:
+                            leaf_pages_found += 1
+                            product_count = result["product_count"]
+                            total_products += product_count
 
-                        # Update category status in our data structure
-                        self.update_category_leaf_status(category_name, False)
+                            self.pagent.logger.info(
+                                _LOG_LEAF_PAGE, product_count, category_name
+                            )
 
-                    results.append(result)
-                else:
-                    error_msg = f"Failed to process category '{category_name}': {result.get('error', 'Unknown error')}"
-                    self.pagent.logger.error(f"❌ {error_msg}")
-                    errors.append(error_msg)
-                    results.append(result)
+                            # Update category status in our data structure
+                            self.update_category_leaf_status(category_name, True)
+                        else:
+                            non_leaf_pages_found += 1
+                            self.pagent.logger.info(_LOG_NON_LEAF_PAGE, category_name)
 
-            except Exception as e:
-                error_msg = f"Exception processing category '{category_name}': {str(e)}"
-                self.pagent.logger.error(f"💥 {error_msg}")
-                errors.append(error_msg)
+                            # Update category status in our data structure
+                            self.update_category_leaf_status(category_name, False)
+                    else:
+                        error_msg = f"Failed to process category '{category_name}': {result.get('error', 'Unknown error')}"
+                        self.pagent.logger.error("❌ %s", error_msg)
+                        errors.append(error_msg)
 
-                # Add failed result
-                results.append(
-                    {
+                except Exception as e:
+                    error_msg = (
+                        f"Exception processing category '{category_name}': {str(e)}"
+                    )
+                    self.pagent.logger.error("💥 %s", error_msg)
+                    errors.append(error_msg)
+
+                    # Add failed result
+                    result = {
                         "category_name": category_name,
                         "success": False,
                         "error": str(e),
@@ -1238,37 +2065,41 @@ HTML to analyze:
                         "product_count": 0,
                         "is_leaf": False,
                     }
-                )
+
+                pending_lines[i] = self._result_line(result)
+                while next_line in pending_lines:
+                    results_file.write(pending_lines.pop(next_line))
+                    next_line += 1
 
         # Final summary
-        self.pagent.logger.info(f"""
-🎉 COMPREHENSIVE SCRAPING COMPLETE!
-📊 Summary:
-   • Categories processed: {categories_processed}/{len(all_categories)}
-   • Leaf pages (with products): {leaf_pages_found}
-   • Non-leaf pages (navigation): {non_leaf_pages_found}
-   • Total products found: {total_products}
-   • Errors encountered: {len(errors)}
-        """)
+        self.pagent.logger.info(
+            _LOG_PRODUCTS_SUMMARY,
+            categories_processed,
+            total_categories,
+            leaf_pages_found,
+            non_leaf_pages_found,
+            total_products,
+            len(errors),
+        )
 
         if errors:
-            self.pagent.logger.warning(f"⚠️  Errors encountered:")
+            self.pagent.logger.warning("⚠️  Errors encountered:")
             for error in errors[:5]:  # Show first 5 errors
-                self.pagent.logger.warning(f"   • {error}")
+                self.pagent.logger.warning("   • %s", error)
             if len(errors) > 5:
                 self.pagent.logger.warning(
-                    f"   • ... and {len(errors) - 5} more errors"
+                    "   • ... and %d more errors", len(errors) - 5
                 )
 
         return {
             "success": True,
             "categories_processed": categories_processed,
-            "total_categories": len(all_categories),
+            "total_categories": total_categories,
             "leaf_pages_found": leaf_pages_found,
             "non_leaf_pages_found": non_leaf_pages_found,
             "total_products": total_products,
             "errors": errors,
-            "results": results,
+            "results_path": str(results_path),
             "summary": {
                 "completion_rate": f"{categories_processed}/{len(all_categories)} ({(categories_processed/len(all_categories)*100):.1f}%)",
                 "products_per_leaf_page": total_products / max(leaf_pages_found, 1),
@@ -1309,7 +2140,8 @@ HTML to analyze:
             delay_between_requests: Delay between requests (default 2.0 seconds)
 
         Returns:
-            Dict with comprehensive AI extraction results
+            Dict with AI extraction summary; per-category results are streamed
+            to the JSONL file at results_path, see iter_results
         """
         if not self.ai_enabled:
             return {"success": False, "error": "AI features not enabled"}
@@ -1336,59 +2168,60 @@ HTML to analyze:
             f"📋 Processing {len(all_categories)} categories with AI extraction"
         )
 
-        results = []
+        results_path = self._results_path("ai_extraction")
         total_entities_found = set()
         total_files_created = []
         successful_extractions = 0
         failed_extractions = 0
 
-        for i, category in enumerate(all_categories):
-            category_name = category["name"]
-            self.pagent.logger.info(
-                f"🔄 AI extraction {i+1}/{len(all_categories)}: {category_name}"
-            )
-
-            try:
-                # Add delay between requests
-                if i > 0 and delay_between_requests > 0:
-                    time.sleep(delay_between_requests)
+        with open(results_path, "wb", buffering=_WRITE_BUFFER_SIZE) as results_file:
+            for i, category in enumerate(all_categories):
+                category_name = category["name"]
+                self.pagent.logger.info(
+                    f"🔄 AI extraction {i+1}/{len(all_categories)}: {category_name}"
+                )
 
-                # Apply AI extraction callback
-                result = self.scrape_category_with_ai_callback(category_name)
+                try:
+                    # Add delay between requests
+                    if i > 0 and delay_between_requests > 0:
+                        time.sleep(delay_between_requests)
 
-                if result["success"] and result.get("ai_extraction", {}).get("success"):
-                    successful_extractions += 1
-                    entities = result.get("entities_found", [])
-                    files = result.get("files_created", [])
+                    # Apply AI extraction callback
+                    result = self.scrape_category_with_ai_callback(category_name)
 
-                    total_entities_found.update(entities)
-                    total_files_created.extend(files)
+                    if result["success"] and result.get("ai_extraction", {}).get(
+                        "success"
+                    ):
+                        successful_extractions += 1
+                        entities = result.get("entities_found", [])
+                        files = result.get("files_created", [])
 
-                    self.pagent.logger.info(
-                        f"✅ {category_name}: {len(entities)} entity types, {len(files)} files"
-                    )
-                else:
-                    failed_extractions += 1
-                    error = result.get("error") or result.get("ai_extraction", {}).get(
-                        "error", "Unknown"
-                    )
-                    self.pagent.logger.warning(f"⚠️ {category_name}: {error}")
+                        total_entities_found.update(entities)
+                        total_files_created.extend(files)
 
-                results.append(result)
+                        self.pagent.logger.info(
+                            f"✅ {category_name}: {len(entities)} entity types, {len(files)} files"
+                        )
+                    else:
+                        failed_extractions += 1
+                        error = result.get("error") or result.get(
+                            "ai_extraction", {}
+                        ).get("error", "Unknown")
+                        self.pagent.logger.warning(f"⚠️ {category_name}: {error}")
 
-            except Exception as e:
-                failed_extractions += 1
-                error_msg = f"Exception in AI extraction for {category_name}: {e}"
-                self.pagent.logger.error(f"💥 {error_msg}")
+                except Exception as e:
+                    failed_extractions += 1
+                    error_msg = f"Exception in AI extraction for {category_name}: {e}"
+                    self.pagent.logger.error(f"💥 {error_msg}")
 
-                results.append(
-                    {
+                    result = {
                         "category_name": category_name,
                         "success": False,
                         "error": str(e),
                         "ai_extraction": {"success": False, "error": str(e)},
                     }
-                )
+
+                results_file.write(self._result_line(result))
 
         # Final summary
         self.pagent.logger.info(f"""
@@ -1409,7 +2242,7 @@ HTML to analyze:
             "failed_extractions": failed_extractions,
             "unique_entity_types": list(total_entities_found),
             "total_files_created": len(total_files_created),
-            "results": results,
+            "results_path": str(results_path),
             "summary": {
                 "success_rate": f"{successful_extractions}/{len(all_categories)} ({(successful_extractions/len(all_categories)*100):.1f}%)",
                 "entity_types_discovered": len(total_entities_found),
@@ -1418,26 +2251,71 @@ HTML to analyze:
             },
         }
 
+    def _results_path(self, prefix: str) -> Path:
+        """
+        Create the JSONL file path for a full-site run's per-category results.
+
+        Args:
+            prefix: Run type, used as the file name prefix
+
+        Returns:
+            Path under the db folder's results directory
+        """
+        results_dir = self.pagent.db_folder / "results"
+        results_dir.mkdir(parents=True, exist_ok=True)
+        return results_dir / f"{self._request_folder_name(prefix)}.jsonl"
+
+    @staticmethod
+    def _result_line(result: Dict) -> bytes:
+        """
+        Serialize a per-category result as one JSONL line. The page HTML is
+        left out; it is already saved as page.html in the request folder.
+
+        Args:
+            result: Per-category result dictionary
+
+        Returns:
+            orjson-encoded line including the trailing newline
+        """
+        fetch_result = result.get("fetch_result")
+        if fetch_result and not fetch_result.keys().isdisjoint(_PAGE_BODY_KEYS):
+            fetch_result = {
+                k: v for k, v in fetch_result.items() if k not in _PAGE_BODY_KEYS
+            }
+            result = {**result, "fetch_result": fetch_result}
+        return orjson.dumps(result, default=str) + b"\n"
+
+    @staticmethod
+    def iter_results(results_path: Union[str, Path]) -> Iterator[Dict]:
+        """
+        Lazily read per-category results written by a full-site run.
+
+        Args:
+            results_path: results_path returned by the run
+
+        Yields:
+            Per-category result dictionaries, in completion order
+        """
+        with open(results_path, "rb") as f:
+            for line in f:
+                yield orjson.loads(line)
+
     def _flatten_categories(self, categories: List[Dict]) -> List[Dict]:
         """
         Flatten the nested category structure into a single list.
 
+        For self.categories this is the cached view from _rebuild_indexes.
+
         Args:
             categories: Nested category structure
 
         Returns:
-            Flat list of all categories
+            Flat list of all categories (shared for self.categories; do not modify)
         """
-        flattened = []
-
-        def flatten_recursive(cats):
-            for cat in cats:
-                flattened.append(cat)
-                if cat.get("children"):
-                    flatten_recursive(cat["children"])
-
-        flatten_recursive(categories)
-        return flattened
+        if categories is self.categories:
+            self._rebuild_indexes()
+            return self._flat_categories
+        return list(_iter_category_tree(categories))
 
     def scrape_category_with_ai_callback(self, category_name: str) -> Dict:
         """
@@ -1457,8 +2335,9 @@ HTML to analyze:
             }
 
         try:
-            # Fetch the category page
-            fetch_result = self.fetch_category_page(category_name)
+            # Fetch the category page, keeping its raw bytes for the extractor
+            fetch_result = self.fetch_category_page(category_name, keep_bytes=True)
+            html_bytes = fetch_result.pop("content_bytes", None)
 
             if not fetch_result["success"]:
                 return {
@@ -1470,7 +2349,9 @@ HTML to analyze:
 
             # Apply AI callback to generate and execute extraction function
             ai_result = self.ai_callback_generate_and_execute_extractor(
-                fetch_result["content"], fetch_result.get("request_folder")
+                fetch_result["content"],
+                fetch_result.get("request_folder"),
+                html_bytes,
             )
 
             return {
@@ -1491,7 +2372,10 @@ HTML to analyze:
             }
 
     def ai_callback_generate_and_execute_extractor(
-        self, html_content: str, request_folder: str = None
+        self,
+        html_content: str,
+        request_folder: str = None,
+        html_bytes: Optional[bytes] = None,
     ) -> Dict:
         """
         AI callback that generates a custom Python extraction function and executes it.
@@ -1505,6 +2389,7 @@ HTML to analyze:
         Args:
             html_content: HTML content to analyze
             request_folder: Folder to save extraction function and results
+            html_bytes: The same page as UTF-8 bytes, if the fetch kept them
 
         Returns:
             Dict with AI extraction results
@@ -1524,17 +2409,19 @@ HTML to analyze:
             if request_folder:
                 function_path = Path(request_folder) / "extract_data.py"
                 try:
-                    with open(function_path, "w", encoding="utf-8") as f:
-                        f.write(function_result["function_code"])
-                    self.pagent.logger.info(
-                        f"💾 Saved extraction function: {function_path}"
+                    self._write_file_async(
+                        function_path,
+                        function_result["function_code"].encode("utf-8"),
+                        f"💾 Saved extraction function: {function_path}",
                     )
                 except Exception as e:
                     self.pagent.logger.warning(f"⚠️ Failed to save function: {e}")
 
             # Step 3: Execute the generated function
+            if html_bytes is None:
+                html_bytes = html_content.encode("utf-8")
             execution_result = self._execute_extractor_function(
-                function_result["function_code"], html_content, request_folder
+                function_result["function_code"], html_bytes, request_folder
             )
 
             return {
@@ -1560,64 +2447,30 @@ HTML to analyze:
         # Determine page type hint for better category classification
         page_type_hint = self._determine_page_type_hint(cleaned_html)
 
-        prompt = f"""
-You are an expert Python developer creating data extraction functions for Costco.ca pages.
-
-CRITICAL: Use the STANDARDIZED CATEGORY INTERFACE for all category extractions:
-
-For categories.json, each category MUST use this exact structure:
-```json
-{{
-    "name": "Category Display Name",
-    "url": "/relative-url-path", 
-    "category_type": "leaf_product|leaf_service|leaf_location|non_leaf_navigation|non_leaf_hub|unknown",
-    "description": "Brief description if available",
-    "parent_category": "Parent category name if applicable",
-    "subcategories": ["list", "of", "subcategory", "names"],
-    "is_leaf": true/false,
-    "metadata": {{"additional": "data"}}
-}}
-```
-
-CATEGORY TYPE DEFINITIONS:
-- leaf_product: Contains actual products for purchase
-- leaf_service: Contains services (insurance, photo, travel, etc.)
-- leaf_location: Store locations/warehouses
-- non_leaf_navigation: Navigation to subcategories
-- non_leaf_hub: Hub page with mixed content
-- unknown: Cannot determine type
-
-PAGE TYPE: {page_type_hint}
-
-Create a Python function that:
-1. Discovers ALL entities (products, categories, services, promotions, etc.)
-2. For CATEGORIES: Use the standardized interface above
-3. For OTHER entities: Use appropriate structures
-4. Saves each entity type to separate JSON files
-5. Returns dict with entities_found list and files_created list
-
-CRITICAL RETURN FORMAT:
-```python
-return {{
-    "entities_found": ["categories", "products", "services"],  # List of ENTITY TYPE NAMES (strings)
-    "files_created": ["/path/to/categories.json", "/path/to/products.json"]  # List of file paths
-}}
-```
-
-Requirements:
-- Function named `extract_data(html_content, output_folder=None)`
-- Use BeautifulSoup for parsing
-- Handle errors gracefully
-- Determine category_type based on URL patterns and context
-- Set is_leaf correctly based on category_type
-- entities_found must contain ONLY string names of entity types, NOT the actual objects
-- Only include entity types in entities_found if you actually found and saved data for them
-
-HTML to analyze:
-{cleaned_html[:20000]}
-
-Return ONLY the complete Python function code, no explanations.
-"""
+        page_html = cleaned_html[:_EXTRACTOR_HTML_CHARS]
+        key = self._structure_fingerprint(html_content, page_type_hint, page_html)
+        with self._extractor_cache_lock:
+            function_code = self._extractor_cache.get(key)
+            if function_code is not None:
+                self._extractor_cache.move_to_end(key)
+                self.pagent.logger.debug("💾 Reusing generated extraction function")
+                return {"success": True, "function_code": function_code}
+
+        source_file = self.extractor_code_dir / f"{key.hex()}.py"
+        function_code = self._read_extractor_source(source_file)
+        if function_code is not None:
+            self._remember_extractor(key, function_code)
+            return {"success": True, "function_code": function_code}
+
+        prompt = "".join(
+            (
+                _EXTRACTOR_PROMPT_HEAD,
+                page_type_hint,
+                _EXTRACTOR_PROMPT_MID,
+                page_html,
+                _EXTRACTOR_PROMPT_TAIL,
+            )
+        )
 
         try:
             response = self.gemini_model.generate_content(prompt)
@@ -1630,7 +2483,7 @@ Return ONLY the complete Python function code, no explanations.
                 function_code = function_code.split("```")[1].split("```")[0]
 
             # Ensure proper imports including category interface
-            required_imports = """from bs4 import BeautifulSoup
+            required_imports = """from bs4 import BeautifulSoup, SoupStrainer
 import json
 from pathlib import Path
 
@@ -1656,38 +2509,27 @@ def create_standard_category(name, url=None, category_type="unknown", descriptio
         "metadata": metadata
     }
 
+# (keywords, category type, whether the name is searched too) in priority order
+_CATEGORY_TYPE_DISPATCH = (
+    (("product", "catalog", ".product.", "item"), "leaf_product", False),
+    (("insurance", "photo", "travel", "optical", "pharmacy", "service"), "leaf_service", True),
+    (("warehouse", "location", "store", "address"), "leaf_location", True),
+    (("category", "department", "browse", "sitemap"), "non_leaf_navigation", False),
+    (("home", "main", "index", "hub"), "non_leaf_hub", True),
+)
+
 def determine_category_type(url, name, context=""):
     \"\"\"Determine category type based on URL patterns and context.\"\"\"
     if not url:
         return "unknown"
     
     url_lower = url.lower()
-    name_lower = name.lower()
-    context_lower = context.lower()
-    
-    # Product indicators
-    if any(indicator in url_lower for indicator in ["product", "catalog", ".product.", "item"]):
-        return "leaf_product"
-    
-    # Service indicators  
-    if any(indicator in url_lower + name_lower for indicator in 
-           ["insurance", "photo", "travel", "optical", "pharmacy", "service"]):
-        return "leaf_service"
+    url_name_lower = url_lower + name.lower()
     
-    # Location indicators
-    if any(indicator in url_lower + name_lower for indicator in 
-           ["warehouse", "location", "store", "address"]):
-        return "leaf_location"
-    
-    # Navigation indicators
-    if any(indicator in url_lower for indicator in 
-           ["category", "department", "browse", "sitemap"]):
-        return "non_leaf_navigation"
-    
-    # Hub indicators (mixed content)
-    if any(indicator in url_lower + name_lower for indicator in 
-           ["home", "main", "index", "hub"]):
-        return "non_leaf_hub"
+    for keywords, category_type, match_name in _CATEGORY_TYPE_DISPATCH:
+        haystack = url_name_lower if match_name else url_lower
+        if any(keyword in haystack for keyword in keywords):
+            return category_type
     
     return "unknown"
 
@@ -1703,9 +2545,18 @@ def determine_category_type(url, name, context=""):
             ):
                 function_code = required_imports + "\n\n" + function_code
 
+            function_code = function_code.strip()
+            self._remember_extractor(key, function_code)
+            self.extractor_code_dir.mkdir(parents=True, exist_ok=True)
+            self._write_file_async(
+                source_file,
+                function_code.encode("utf-8"),
+                f"💾 Cached extraction function: {source_file.name}",
+            )
+
             return {
                 "success": True,
-                "function_code": function_code.strip(),
+                "function_code": function_code,
             }
 
         except Exception as e:
@@ -1714,27 +2565,89 @@ def determine_category_type(url, name, context=""):
                 "error": f"Failed to generate function: {e}",
             }
 
+    def _structure_fingerprint(
+        self, html_content: str, page_type_hint: str, page_html: str
+    ) -> bytes:
+        """
+        Key a page by the extractor contract version, its type hint and the
+        layout of its main content.
+
+        The sorted (tag, class) pairs of the leading content elements stay the
+        same across pages rendered from one template, whatever their products.
+
+        Args:
+            html_content: HTML content of the page
+            page_type_hint: Hint from _determine_page_type_hint
+            page_html: Prompt HTML, hashed instead when the page cannot be parsed
+
+        Returns:
+            16-byte digest
+        """
+        digest = hashlib.blake2b(
+            f"{_EXTRACTOR_CONTRACT_VERSION}\0{page_type_hint}".encode("utf-8"),
+            digest_size=16,
+        )
+        try:
+            tree = self._page_tree(html_content)
+        except (etree.ParserError, ValueError):
+            digest.update(b"\0" + page_html.encode("utf-8"))
+            return digest.digest()
+
+        root = tree.find(".//main")
+        if root is None:
+            root = tree.find("body")
+        if root is None:
+            root = tree
+        shape = sorted(
+            (element.tag, element.get("class", ""))
+            for element in itertools.islice(
+                root.iter(etree.Element), _EXTRACTOR_FINGERPRINT_ELEMENTS
+            )
+        )
+        for tag, classes in shape:
+            digest.update(f"\0{tag}\1{classes}".encode("utf-8"))
+        return digest.digest()
+
+    def _remember_extractor(self, key: bytes, function_code: str) -> None:
+        """
+        Keep generated extractor code in the in-memory LRU.
+        """
+        with self._extractor_cache_lock:
+            self._extractor_cache[key] = function_code
+            if len(self._extractor_cache) > _EXTRACTOR_CACHE_SIZE:
+                self._extractor_cache.popitem(last=False)
+
+    def _read_extractor_source(self, source_file: Path) -> Optional[str]:
+        """
+        Load extractor code generated by an earlier run, or None on a cache miss.
+        """
+        try:
+            function_code = source_file.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            self.pagent.logger.warning(
+                f"⚠️ Ignoring unreadable extractor cache: {e}"
+            )
+            return None
+
+        self.pagent.logger.debug(
+            f"💾 Extraction function cache hit: {source_file.name}"
+        )
+        return function_code
+
     def _execute_extractor_function(
-        self, function_code: str, html_content: str, output_folder: str = None
+        self, function_code: str, html_bytes: bytes, output_folder: str = None
     ) -> Dict:
         """
-        Execute the AI-generated extraction function.
+        Execute the AI-generated extraction function on the page's UTF-8 bytes.
         """
         try:
-            # Create a safe execution environment
-            exec_globals = {
-                "__builtins__": __builtins__,
-                "BeautifulSoup": BeautifulSoup,
-                "json": json,
-                "Path": Path,
-            }
-
-            # Execute the function code
-            exec(function_code, exec_globals)
+            extract_data = self._load_extractor(function_code)
 
             # Call the extract_data function
-            if "extract_data" in exec_globals:
-                result = exec_globals["extract_data"](html_content, output_folder)
+            if extract_data is not None:
+                result = extract_data(html_bytes, output_folder)
                 self.pagent.logger.info(f"✅ Function executed successfully")
                 return result
             else:
@@ -1752,6 +2665,78 @@ def determine_category_type(url, name, context=""):
                 "files_created": [],
             }
 
+    def _load_extractor(self, function_code: str) -> Optional[Callable]:
+        """
+        Compile generated extractor code once and return its extract_data.
+
+        Args:
+            function_code: Generated Python source defining extract_data
+
+        Returns:
+            The extract_data function, or None if the code does not define one
+        """
+        key = hashlib.blake2b(function_code.encode("utf-8"), digest_size=16).digest()
+        with self._compiled_extractors_lock:
+            if key in self._compiled_extractors:
+                self._compiled_extractors.move_to_end(key)
+                return self._compiled_extractors[key]
+
+        # marshal data is specific to the interpreter version, which the
+        # cache tag (e.g. cpython-311) names
+        code_file = (
+            self.extractor_code_dir
+            / f"{key.hex()}.{sys.implementation.cache_tag}.bin"
+        )
+        code = self._load_extractor_code(code_file)
+        if code is None:
+            code = compile(function_code, "<extract_data>", "exec")
+            self._store_extractor_code(code_file, code)
+
+        # Create a safe execution environment
+        exec_globals = {
+            "__builtins__": __builtins__,
+            "BeautifulSoup": BeautifulSoup,
+            "SoupStrainer": SoupStrainer,
+            "etree": etree,
+            "json": json,
+            "Path": Path,
+        }
+        exec(code, exec_globals)
+        extract_data = exec_globals.get("extract_data")
+
+        with self._compiled_extractors_lock:
+            self._compiled_extractors[key] = extract_data
+            if len(self._compiled_extractors) > _EXTRACTOR_CACHE_SIZE:
+                self._compiled_extractors.popitem(last=False)
+        return extract_data
+
+    def _load_extractor_code(self, code_file: Path):
+        """
+        Load compiled extractor bytecode, or None on a cache miss.
+        """
+        try:
+            code = marshal.loads(code_file.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            self.pagent.logger.warning(
+                f"⚠️ Ignoring unreadable extractor cache: {e}"
+            )
+            return None
+
+        self.pagent.logger.debug(f"💾 Extractor bytecode cache hit: {code_file.name}")
+        return code
+
+    def _store_extractor_code(self, code_file: Path, code) -> None:
+        """
+        Persist compiled extractor bytecode for later runs.
+        """
+        try:
+            self.extractor_code_dir.mkdir(parents=True, exist_ok=True)
+            code_file.write_bytes(marshal.dumps(code))
+        except OSError as e:
+            self.pagent.logger.warning(f"⚠️ Failed to write extractor cache: {e}")
+
     def _load_cached_categories(self) -> Optional[List[Dict]]:
         """
         Load cached categories from the most recent sitemap request folder.
@@ -1760,19 +2745,25 @@ def determine_category_type(url, name, context=""):
             if not self.pagent.page_requests_dir.exists():
                 return None
 
-            # Find the most recent sitemap folder
-            sitemap_folders = [
-                d
-                for d in self.pagent.page_requests_dir.iterdir()
-                if d.is_dir() and "sitemap" in d.name.lower()
-            ]
+            # Find the most recent sitemap folder; DirEntry.is_dir() reuses the
+            # type reported by the directory scan
+            with os.scandir(self.pagent.page_requests_dir) as entries:
+                sitemap_folders = [
+                    entry.name
+                    for entry in entries
+                    if "sitemap" in entry.name.lower()
+                    and entry.is_dir()
+                ]
 
             if not sitemap_folders:
                 return None
 
-            # Sort by creation time, get most recent
-            latest_folder = max(sitemap_folders, key=lambda x: x.stat().st_ctime)
-            categories_file = latest_folder / "categories.json"
+            # Folder names embed their creation timestamp, so order by it
+            # rather than stat() every candidate
+            latest_folder = max(sitemap_folders, key=_folder_timestamp_key)
+            categories_file = (
+                self.pagent.page_requests_dir / latest_folder / "categories.json"
+            )
 
             if categories_file.exists():
                 with open(categories_file, "r", encoding="utf-8") as f:
@@ -1793,8 +2784,11 @@ def determine_category_type(url, name, context=""):
         """
         try:
             categories_file = Path(request_folder) / "categories.json"
-            with open(categories_file, "w", encoding="utf-8") as f:
-                json.dump(self.categories, f, indent=2, ensure_ascii=False)
+            # Serialize once and hand the file a single UTF-8 buffer
+            _write_bytes(
+                categories_file,
+                orjson.dumps(self.categories, option=orjson.OPT_INDENT_2),
+            )
             self.pagent.logger.info(f"Categories saved to: {categories_file}")
         except Exception as e:
             self.pagent.logger.warning(f"Failed to save categories: {e}")
@@ -1803,46 +2797,16 @@ def determine_category_type(url, name, context=""):
         """
         Analyze HTML to provide a hint about the page type for better category classification.
         """
-        html_lower = html_content.lower()
+        # Keywords are lower case, so a product hit in the raw page is also one
+        # in the lowered copy; listing pages resolve without copying the page
+        product_hint, product_keywords = _PAGE_TYPE_HINTS[0]
+        if any(keyword in html_content for keyword in product_keywords):
+            return product_hint
 
-        # Check for product indicators
-        product_indicators = [
-            "product-tile",
-            "product-grid",
-            "add-to-cart",
-            "price",
-            "buy-now",
-        ]
-        if any(indicator in html_lower for indicator in product_indicators):
-            return "product_listing"
-
-        # Check for service indicators
-        service_indicators = [
-            "insurance",
-            "photo",
-            "travel",
-            "optical",
-            "pharmacy",
-            "gas",
-        ]
-        if any(indicator in html_lower for indicator in service_indicators):
-            return "service_page"
-
-        # Check for location indicators
-        location_indicators = [
-            "warehouse",
-            "store-hours",
-            "address",
-            "phone",
-            "directions",
-        ]
-        if any(indicator in html_lower for indicator in location_indicators):
-            return "location_page"
-
-        # Check for navigation indicators
-        nav_indicators = ["sitemap", "category", "department", "browse", "menu"]
-        if any(indicator in html_lower for indicator in nav_indicators):
-            return "navigation_page"
+        html_lower = html_content.lower()
+        for hint, keywords in _PAGE_TYPE_HINTS:
+            if any(keyword in html_lower for keyword in keywords):
+                return hint
 
         return "unknown"
 
@@ -1903,7 +2867,9 @@ if __name__ == "__main__":
 
             # Show detailed results for first few categories
             print("\n📋 Detailed Results (first 5):")
-            for i, result in enumerate(results["results"][:5]):
+            for result in itertools.islice(
+                scraper.iter_results(results["results_path"]), 5
+            ):
                 status = (
                     "✅" if result.get("ai_extraction", {}).get("success") else "❌"
                 )
@@ -92,11 +92,13 @@ CREATE INDEX idx_categories_session_id ON categories(session_id);
 CREATE INDEX idx_categories_parent_id ON categories(parent_category_id);
 CREATE INDEX idx_categories_type ON categories(category_type);
 CREATE INDEX idx_categories_path ON categories(path);
+CREATE INDEX idx_categories_session_type ON categories(session_id, category_type, is_leaf);
 
 CREATE INDEX idx_products_session_id ON products(session_id);
 CREATE INDEX idx_products_item_number ON products(item_number);
 CREATE INDEX idx_products_name ON products(name);
 CREATE INDEX idx_products_brand ON products(brand);
+CREATE INDEX idx_products_session_name ON products(session_id, name);
 
 CREATE INDEX idx_category_products_category ON category_products(category_id);
 CREATE INDEX idx_category_products_product ON category_products(product_id);
@@ -1,47 +1,96 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import etree
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities_found = []
-        files_created = []
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every product tile
+_NAME = XPath(f"(.//span[{_has_class('description')}])[1]")
+_PRICE = XPath(f"(.//div[{_has_class('price')}])[1]")
+_IMAGE = XPath("(.//img)[1]")
+_FEATURES = XPath(f"(.//ul[{_has_class('product-features')}])[1]")
+_RATING = XPath(f"(.//div[{_has_class('ratings-number')}])[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# The page is fed to the parser in chunks of this many bytes
+_CHUNK_SIZE = 64 * 1024
 
-        products = []
-        product_elements = soup.find_all('div', class_='product-tile-set')
-        for product in product_elements:
+def _iter_closed(html_bytes, tags):
+    # Yield each element with one of the given tags as soon as its end tag is parsed
+    parser = etree.HTMLPullParser(events=('end',), tag=tags, encoding='utf-8')
+    for start in range(0, len(html_bytes), _CHUNK_SIZE):
+        parser.feed(html_bytes[start:start + _CHUNK_SIZE])
+        for _, element in parser.read_events():
+            yield element
+    parser.close()
+    for _, element in parser.read_events():
+        yield element
+
+def extract_data(html_bytes, output_folder=None):
+    entities_found = []
+    files_created = []
+    writes = []
+
+    products = []
+    category_name = None
+    for element in _iter_closed(html_bytes, ('div', 'h1')):
+        classes = element.get('class', '').split()
+        if element.tag == 'div' and 'product-tile-set' in classes:
+            product = element
+            features_el = _FEATURES(product)
+            rating_el = _RATING(product)
             product_data = {
-                'name': product.find('span', class_='description').text.strip(),
-                'price': product.find('div', class_='price').text.strip(),
+                'name': _TEXT(_NAME(product)[0]).strip(),
+                'price': _TEXT(_PRICE(product)[0]).strip(),
                 'url': product.get('data-pdp-url'),
-                'image': product.find('img').get('data-src'),
-                'features': [li.text.strip() for li in product.find('ul', class_='product-features').find_all('li')] if product.find('ul', class_='product-features') else [],
-                'rating': product.find('div', class_='ratings-number').text.strip().replace('(', '').replace(')', '') if product.find('div', class_='ratings-number') else None
+                'image': _IMAGE(product)[0].get('data-src'),
+                'features': [_TEXT(li).strip() for li in features_el[0].iter('li')] if features_el else [],
+                'rating': _TEXT(rating_el[0]).strip().strip('()') if rating_el else None
             }
             products.append(product_data)
+            # Free the tile and everything parsed before it at the same level
+            product.clear()
+            while product.getprevious() is not None:
+                del product.getparent()[0]
+        elif category_name is None and element.tag == 'h1' and 't1-style' in classes:
+            category_name = _TEXT(element).strip()
+
+    if products:
+        entities_found.append('products')
+        if output_folder:
+            filepath = os.path.join(output_folder, 'products.json')
+            writes.append((filepath, products))
+            files_created.append(filepath)
+
+
+    categories = []
+    if category_name is not None:
+        categories.append({'name': category_name})
+        entities_found.append('categories')
+        if output_folder:
+            filepath = os.path.join(output_folder, 'categories.json')
+            writes.append((filepath, categories))
+            files_created.append(filepath)
 
-        if products:
-            entities_found.append('products')
-            if output_folder:
-                filepath = os.path.join(output_folder, 'products.json')
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(products, f, indent=4)
-                files_created.append(filepath)
-
-
-        categories = []
-        category_element = soup.find('h1', class_='t1-style')
-        if category_element:
-            categories.append({'name': category_element.text.strip()})
-            entities_found.append('categories')
-            if output_folder:
-                filepath = os.path.join(output_folder, 'categories.json')
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(categories, f, indent=4)
-                files_created.append(filepath)
-
-        return {'entities_found': entities_found, 'files_created': files_created}
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return {'entities_found': [], 'files_created': []}
\ No newline at end of file
+    _write_all(writes)
+    return {'entities_found': entities_found, 'files_created': files_created}
\ No newline at end of file
@@ -1,49 +1,76 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities_found = []
-        files_created = []
-
-        # Extract categories
-        categories = []
-        category_elements = soup.find_all(class_="categoryname")
-        for element in category_elements:
-            category = element.find('h1').text.strip()
-            categories.append({'name': category})
-        if categories:
-            entities_found.append('categories')
-            if output_folder:
-                filepath = os.path.join(output_folder, 'categories.json')
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(categories, f, indent=4)
-                files_created.append(filepath)
-
-
-        # Extract products
-        products = []
-        product_elements = soup.find_all(class_="product-tile-set")
-        for element in product_elements:
-            product = {}
-            product['name'] = element.find('span', class_='description').text.strip()
-            product['price'] = element.find(class_='price').text.strip()
-            product['image'] = element.find('img')['src']
-            product['url'] = element.get('data-pdp-url')
-            products.append(product)
-
-        if products:
-            entities_found.append('products')
-            if output_folder:
-                filepath = os.path.join(output_folder, 'products.json')
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(products, f, indent=4)
-                files_created.append(filepath)
-
-        return {'entities_found': entities_found, 'files_created': files_created}
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return {'entities_found': [], 'files_created': []}
\ No newline at end of file
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every product tile
+_CATEGORIES = XPath(f"//*[{_has_class('categoryname')}]")
+_CATEGORY_NAME = XPath("(.//h1)[1]")
+_PRODUCT_TILES = XPath(f"//*[{_has_class('product-tile-set')}]")
+_NAME = XPath(f"(.//span[{_has_class('description')}])[1]")
+_PRICE = XPath(f"(.//*[{_has_class('price')}])[1]")
+_IMAGE = XPath("(.//img)[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities_found = []
+    files_created = []
+    writes = []
+
+    # Extract categories
+    categories = []
+    for element in _CATEGORIES(tree):
+        category = _TEXT(_CATEGORY_NAME(element)[0]).strip()
+        categories.append({'name': category})
+    if categories:
+        entities_found.append('categories')
+        if output_folder:
+            filepath = os.path.join(output_folder, 'categories.json')
+            writes.append((filepath, categories))
+            files_created.append(filepath)
+
+
+    # Extract products
+    products = []
+    for element in _PRODUCT_TILES(tree):
+        product = {}
+        product['name'] = _TEXT(_NAME(element)[0]).strip()
+        product['price'] = _TEXT(_PRICE(element)[0]).strip()
+        product['image'] = _IMAGE(element)[0].attrib['src']
+        product['url'] = element.get('data-pdp-url')
+        products.append(product)
+
+    if products:
+        entities_found.append('products')
+        if output_folder:
+            filepath = os.path.join(output_folder, 'products.json')
+            writes.append((filepath, products))
+            files_created.append(filepath)
+
+    _write_all(writes)
+    return {'entities_found': entities_found, 'files_created': files_created}
\ No newline at end of file
@@ -1,17 +1,69 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import etree
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every product tile
+_NAME = XPath(f"(.//span[{_has_class('description')}])[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# The page is fed to the parser in chunks of this many bytes
+_CHUNK_SIZE = 64 * 1024
+
+def _iter_closed(html_bytes, tags):
+    # Yield each element with one of the given tags as soon as its end tag is parsed
+    parser = etree.HTMLPullParser(events=('end',), tag=tags, encoding='utf-8')
+    for start in range(0, len(html_bytes), _CHUNK_SIZE):
+        parser.feed(html_bytes[start:start + _CHUNK_SIZE])
+        for _, element in parser.read_events():
+            yield element
+    parser.close()
+    for _, element in parser.read_events():
+        yield element
+
+def extract_data(html_bytes, output_folder=None):
     categories = []
     products = []
     entities_found = []
     files_created = []
+    writes = []
 
-    category_element = soup.find('h1', class_='t1-style')
-    if category_element:
-        category_name = category_element.text.strip()
+    category_name = None
+    for element in _iter_closed(html_bytes, ('div', 'h1')):
+        classes = element.get('class', '').split()
+        if element.tag == 'div' and 'product-tile-set' in classes:
+            pdp_url = element.get('data-pdp-url')
+            if pdp_url:
+                products.append({"name": _TEXT(_NAME(element)[0]).strip(), "url": pdp_url})
+            # Free the tile and everything parsed before it at the same level
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        elif category_name is None and element.tag == 'h1' and 't1-style' in classes:
+            category_name = _TEXT(element).strip()
+
+    if category_name is not None:
         categories.append({
             "name": category_name,
             "url": "/",
@@ -23,29 +75,22 @@ def extract_data(html_content, output_folder=None):
             "metadata": {}
         })
 
-    product_tiles = soup.find_all('div', class_='product-tile-set')
-    for tile in product_tiles:
-        pdp_url = tile.get('data-pdp-url')
-        if pdp_url:
-            products.append({"name": tile.find('span', class_='description').text.strip(), "url": pdp_url})
-
 
     if categories:
         entities_found.append("categories")
         if output_folder:
             filepath = os.path.join(output_folder, "categories.json")
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(categories, f, indent=4)
+            writes.append((filepath, categories))
             files_created.append(filepath)
 
     if products:
         entities_found.append("products")
         if output_folder:
             filepath = os.path.join(output_folder, "products.json")
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(products, f, indent=4)
+            writes.append((filepath, products))
             files_created.append(filepath)
 
+    _write_all(writes)
     return {
         "entities_found": entities_found,
         "files_created": files_created
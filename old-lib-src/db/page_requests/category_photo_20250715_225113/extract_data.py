@@ -1,52 +1,81 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities = {}
-        entities_found = []
-        files_created = []
-
-        #Example - Adapt to your actual HTML structure
-        products = []
-        for product in soup.find_all('div', class_='product'): #Replace with your actual class or tag
-            product_data = {
-                'name': product.find('h3').text.strip(),
-                'price': product.find('span', class_='price').text.strip(),
-                #Add other product attributes as needed
-            }
-            products.append(product_data)
-        if products:
-            entities['products'] = products
-            entities_found.append('products')
-
-
-        categories = []
-        for category in soup.find_all('div', class_='category'): #Replace with your actual class or tag
-            category_data = {
-                'name': category.find('h2').text.strip(),
-                #Add other category attributes as needed
-            }
-            categories.append(category_data)
-        if categories:
-            entities['categories'] = categories
-            entities_found.append('categories')
-
-
-        #Add similar blocks for other entity types (sales, promotions etc.)
-
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            for entity_type, data in entities.items():
-                filepath = os.path.join(output_folder, f'{entity_type}.json')
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4)
-                files_created.append(filepath)
-
-        return {'entities_found': entities_found, 'files_created': files_created}
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return {'entities_found': [], 'files_created': []}
\ No newline at end of file
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_PRODUCTS = XPath(f"//div[{_has_class('product')}]") #Replace with your actual class or tag
+_PRODUCT_NAME = XPath("(.//h3)[1]")
+_PRODUCT_PRICE = XPath(f"(.//span[{_has_class('price')}])[1]")
+_CATEGORIES = XPath(f"//div[{_has_class('category')}]") #Replace with your actual class or tag
+_CATEGORY_NAME = XPath("(.//h2)[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities = {}
+    entities_found = []
+    files_created = []
+    writes = []
+
+    #Example - Adapt to your actual HTML structure
+    products = []
+    for product in _PRODUCTS(tree):
+        product_data = {
+            'name': _TEXT(_PRODUCT_NAME(product)[0]).strip(),
+            'price': _TEXT(_PRODUCT_PRICE(product)[0]).strip(),
+            #Add other product attributes as needed
+        }
+        products.append(product_data)
+    if products:
+        entities['products'] = products
+        entities_found.append('products')
+
+
+    categories = []
+    for category in _CATEGORIES(tree):
+        category_data = {
+            'name': _TEXT(_CATEGORY_NAME(category)[0]).strip(),
+            #Add other category attributes as needed
+        }
+        categories.append(category_data)
+    if categories:
+        entities['categories'] = categories
+        entities_found.append('categories')
+
+
+    #Add similar blocks for other entity types (sales, promotions etc.)
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        for entity_type, data in entities.items():
+            filepath = os.path.join(output_folder, f'{entity_type}.json')
+            writes.append((filepath, data))
+            files_created.append(filepath)
+
+    _write_all(writes)
+    return {'entities_found': entities_found, 'files_created': files_created}
\ No newline at end of file
@@ -1,56 +1,87 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import etree, html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities = {}
-        entities_found = []
-        files_created = []
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+# Classes marking a promotion row
+_PROMOTION_CLASSES = {'rs-costco-services-hero-row', 'rs-costco-services-promise-row'}
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_PROMOTION_TITLE = XPath("(.//*[self::h1 or self::h2])[1]")
+_PROMOTION_DESCRIPTION = XPath("(.//p)[1]")
+_CATEGORY_NAME = XPath("(.//span[@itemprop='name'])[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities = {}
+    entities_found = []
+    files_created = []
+    writes = []
+
+    promotions = []
+    categories = []
+    links = []
+    # One pass over the document, handing each element to every entity it matches
+    for _, element in etree.iterwalk(tree, events=('start',), tag=etree.Element):
+        classes = element.get('class', '').split()
 
         # Extract promotions
-        promotions = []
-        promotion_elements = soup.find_all(class_=['rs-costco-services-hero-row', 'rs-costco-services-promise-row'])
-        for element in promotion_elements:
-            title = element.find('h1' or 'h2').text.strip() if element.find('h1' or 'h2') else None
-            description = element.find('p').text.strip() if element.find('p') else None
+        if not _PROMOTION_CLASSES.isdisjoint(classes):
+            title_el = _PROMOTION_TITLE(element)
+            title = _TEXT(title_el[0]).strip() if title_el else None
+            p_el = _PROMOTION_DESCRIPTION(element)
+            description = _TEXT(p_el[0]).strip() if p_el else None
             promotion = {'title': title, 'description': description}
             promotions.append(promotion)
-        if promotions:
-            entities['promotions'] = promotions
-            entities_found.append('promotions')
 
         # Extract categories
-        categories = []
-        category_elements = soup.find_all('li', itemprop='itemListElement')
-        for element in category_elements:
-            category_name = element.find('span', itemprop='name').text.strip()
+        if element.tag == 'li' and element.get('itemprop') == 'itemListElement':
+            category_name = _TEXT(_CATEGORY_NAME(element)[0]).strip()
             categories.append(category_name)
-        if categories:
-            entities['categories'] = categories
-            entities_found.append('categories')
 
         #Extract links
-        links = []
-        link_elements = soup.find_all('a', class_='external')
-        for element in link_elements:
-            link = element['href']
+        if element.tag == 'a' and 'external' in classes:
+            link = element.attrib['href']
             links.append(link)
-        if links:
-            entities['links'] = links
-            entities_found.append('links')
-
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            for entity_type, data in entities.items():
-                filepath = os.path.join(output_folder, f"{entity_type}.json")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4)
-                files_created.append(filepath)
-
-        return {'entities_found': entities_found, 'files_created': files_created}
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return {'entities_found': [], 'files_created': []}
\ No newline at end of file
+
+    if promotions:
+        entities['promotions'] = promotions
+        entities_found.append('promotions')
+    if categories:
+        entities['categories'] = categories
+        entities_found.append('categories')
+    if links:
+        entities['links'] = links
+        entities_found.append('links')
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        for entity_type, data in entities.items():
+            filepath = os.path.join(output_folder, f"{entity_type}.json")
+            writes.append((filepath, data))
+            files_created.append(filepath)
+
+    _write_all(writes)
+    return {'entities_found': entities_found, 'files_created': files_created}
\ No newline at end of file
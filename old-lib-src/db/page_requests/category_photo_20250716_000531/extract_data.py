@@ -1,24 +1,65 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import etree, html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_CRUMB_NAME = XPath("(.//span[@itemprop='name'])[1]")
+_CRUMB_LINK = XPath("(.//a)[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
     categories = []
     products = []
     services = []
     entities_found = []
     files_created = []
+    writes = []
+
+    # One pass over the document finds both the breadcrumbs and the services wrapper
+    breadcrumbs = None
+    service_section = None
+    for _, element in etree.iterwalk(tree, events=('start',), tag=('ol', 'div')):
+        if breadcrumbs is None and element.tag == 'ol' and 'crumbs' in element.get('class', '').split():
+            breadcrumbs = element
+        elif service_section is None and element.tag == 'div' and element.get('id') == 'rs-costco-services-wrapper':
+            service_section = element
+        if breadcrumbs is not None and service_section is not None:
+            break
 
     # Extract categories from breadcrumbs
-    breadcrumbs = soup.find('ol', {'class': 'crumbs'})
-    if breadcrumbs:
-        for i, li in enumerate(breadcrumbs.find_all('li')):
-            name = li.find('span', itemprop='name').text.strip()
-            url = li.find('a')['href'] if li.find('a') else None
-            category_type = "non_leaf_navigation" if i < len(breadcrumbs.find_all('li')) -1 else "leaf_service"
-            is_leaf = True if i == len(breadcrumbs.find_all('li')) -1 else False
-            parent_category = breadcrumbs.find_all('li')[i-1].find('span', itemprop='name').text.strip() if i > 0 else None
+    if breadcrumbs is not None:
+        lis = list(breadcrumbs.iter('li'))
+        last = len(lis) - 1
+        parent_category = None
+        for i, li in enumerate(lis):
+            name = _TEXT(_CRUMB_NAME(li)[0]).strip()
+            a_tag = _CRUMB_LINK(li)
+            url = a_tag[0].attrib['href'] if a_tag else None
+            category_type = "non_leaf_navigation" if i < last else "leaf_service"
+            is_leaf = i == last
             categories.append({
                 "name": name,
                 "url": url,
@@ -29,11 +70,11 @@ def extract_data(html_content, output_folder=None):
                 "is_leaf": is_leaf,
                 "metadata": {}
             })
+            parent_category = name
 
 
     # Extract services
-    service_section = soup.find('div', id='rs-costco-services-wrapper')
-    if service_section:
+    if service_section is not None:
       services.append({"name": "Shutterfly Photo Services", "description": "Photo printing and gifting services", "url": "https://www.shutterflycanada.ca"})
       entities_found.append("services")
 
@@ -41,18 +82,17 @@ def extract_data(html_content, output_folder=None):
     if categories:
         if output_folder:
             categories_file_path = os.path.join(output_folder, 'categories.json')
-            with open(categories_file_path, 'w', encoding='utf-8') as f:
-                json.dump(categories, f, indent=4)
+            writes.append((categories_file_path, categories))
             files_created.append(categories_file_path)
         entities_found.append("categories")
 
     if services:
         if output_folder:
             services_file_path = os.path.join(output_folder, 'services.json')
-            with open(services_file_path, 'w', encoding='utf-8') as f:
-                json.dump(services, f, indent=4)
+            writes.append((services_file_path, services))
             files_created.append(services_file_path)
 
+    _write_all(writes)
     return {
         "entities_found": entities_found,
         "files_created": files_created
@@ -1,37 +1,61 @@
-import json
-from bs4 import BeautifulSoup
 import os
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities = {'promotions': [], 'categories': [], 'sales': []}
-        files_created = []
-
-        for li in soup.find_all('li'):
-            a_tag = li.find('a')
-            if a_tag:
-                href = a_tag.get('href')
-                img_tag = a_tag.find('img')
-                alt_text = img_tag.get('alt') if img_tag else None
-
-                if "monthly credit" in alt_text or "annual value" in alt_text:
-                    entities['promotions'].append({'href': href, 'alt_text': alt_text})
-                elif "Warehouse Savings" in alt_text:
-                    entities['sales'].append({'href': href, 'alt_text': alt_text})
-                elif "Alcohol Wine" in alt_text or "beer" in alt_text:
-                    entities['categories'].append({'href': href, 'alt_text': alt_text})
-
-
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            for entity_type, data in entities.items():
-                filepath = os.path.join(output_folder, f"{entity_type}.json")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4)
-                files_created.append(filepath)
-
-        return {'entities_found': list(entities.keys()), 'files_created': files_created}
-
-    except Exception as e:
-        return {'entities_found': [], 'files_created': [], 'error': str(e)}
\ No newline at end of file
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_ITEMS = XPath("//li")
+_LINK = XPath("(.//a)[1]")
+_IMAGE = XPath("(.//img)[1]")
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities = {'promotions': [], 'categories': [], 'sales': []}
+    files_created = []
+    writes = []
+
+    for li in _ITEMS(tree):
+        a_tag = _LINK(li)
+        if a_tag:
+            href = a_tag[0].get('href')
+            img_tag = _IMAGE(a_tag[0])
+            alt_text = img_tag[0].get('alt') if img_tag else None
+
+            if "monthly credit" in alt_text or "annual value" in alt_text:
+                entities['promotions'].append({'href': href, 'alt_text': alt_text})
+            elif "Warehouse Savings" in alt_text:
+                entities['sales'].append({'href': href, 'alt_text': alt_text})
+            elif "Alcohol Wine" in alt_text or "beer" in alt_text:
+                entities['categories'].append({'href': href, 'alt_text': alt_text})
+
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        for entity_type, data in entities.items():
+            filepath = os.path.join(output_folder, f"{entity_type}.json")
+            writes.append((filepath, data))
+            files_created.append(filepath)
+
+    _write_all(writes)
+    return {'entities_found': list(entities.keys()), 'files_created': files_created}
\ No newline at end of file
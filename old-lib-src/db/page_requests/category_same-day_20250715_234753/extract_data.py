@@ -1,37 +1,62 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities = {'promotions': [], 'categories': []}
-        files_created = []
-
-        promotions = soup.find_all('img', {'class': 'e-798uwr'})
-        for promo in promotions:
-            alt_text = promo.get('alt', '')
-            src = promo.get('src', '')
-            entities['promotions'].append({'alt_text': alt_text, 'image_src': src})
-
-
-        links = soup.find_all('a', {'class': 'e-1qcnqs9'})
-        for link in links:
-            href = link.get('href', '')
-            if '/collections/' in href:
-                entities['categories'].append({'url': href})
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
 
-
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            for entity_type, data in entities.items():
-                filepath = os.path.join(output_folder, f"{entity_type}.json")
-                with open(filepath, 'w') as f:
-                    json.dump(data, f, indent=4)
-                files_created.append(filepath)
-
-        return {'entities_found': list(entities.keys()), 'files_created': files_created}
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return {'entities_found': [], 'files_created': []}
\ No newline at end of file
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_PROMOTIONS = XPath(f"//img[{_has_class('e-798uwr')}]")
+_LINKS = XPath(f"//a[{_has_class('e-1qcnqs9')}]")
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities = {'promotions': [], 'categories': []}
+    files_created = []
+    writes = []
+
+    promotions = _PROMOTIONS(tree)
+    for promo in promotions:
+        alt_text = promo.get('alt', '')
+        src = promo.get('src', '')
+        entities['promotions'].append({'alt_text': alt_text, 'image_src': src})
+
+
+    links = _LINKS(tree)
+    for link in links:
+        href = link.get('href', '')
+        if '/collections/' in href:
+            entities['categories'].append({'url': href})
+
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        for entity_type, data in entities.items():
+            filepath = os.path.join(output_folder, f"{entity_type}.json")
+            writes.append((filepath, data))
+            files_created.append(filepath)
+
+    _write_all(writes)
+    return {'entities_found': list(entities.keys()), 'files_created': files_created}
\ No newline at end of file
@@ -1,51 +1,63 @@
 import json
 import os
-from bs4 import BeautifulSoup
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every slide
+_SLIDE_LIST = XPath(f"(//ul[{_has_class('e-rgasvd')}])[1]")
+_LINK = XPath("(.//a)[1]")
+_IMAGE = XPath("(.//img)[1]")
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
     categories = []
     other_entities = []
     entities_found = []
     files_created = []
 
-    try:
-        slides = soup.find('ul', class_='e-rgasvd').find_all('li')
-        for slide in slides:
-            a_tag = slide.find('a')
-            href = a_tag['href']
-            img_alt = a_tag.find('img')['alt']
-            
-            category = {
-                "name": img_alt,
-                "url": href,
-                "category_type": "unknown",
-                "description": img_alt,
-                "parent_category": None,
-                "subcategories": [],
-                "is_leaf": False,
-                "metadata": {}
-            }
-
-            if "/collections/" in href:
-                category["category_type"] = "non_leaf_navigation"
-            elif "/pages/" in href:
-                category["category_type"] = "leaf_service"
-                category["is_leaf"] = True
-            elif "sameday.costco.ca" in href:
-                category["category_type"] = "leaf_service"
-                category["is_leaf"] = True
-            
-            categories.append(category)
-            entities_found.append(category)
-
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            with open(os.path.join(output_folder, 'categories.json'), 'w', encoding='utf-8') as f:
-                json.dump(categories, f, indent=4)
-            files_created.append('categories.json')
-
-    except Exception as e:
-        print(f"Error processing categories: {e}")
+    slides = _SLIDE_LIST(tree)[0].iter('li')
+    for slide in slides:
+        a_tag = _LINK(slide)[0]
+        href = a_tag.attrib['href']
+        img_alt = _IMAGE(a_tag)[0].attrib['alt']
+        
+        category = {
+            "name": img_alt,
+            "url": href,
+            "category_type": "unknown",
+            "description": img_alt,
+            "parent_category": None,
+            "subcategories": [],
+            "is_leaf": False,
+            "metadata": {}
+        }
+
+        if "/collections/" in href:
+            category["category_type"] = "non_leaf_navigation"
+        elif "/pages/" in href:
+            category["category_type"] = "leaf_service"
+            category["is_leaf"] = True
+        elif "sameday.costco.ca" in href:
+            category["category_type"] = "leaf_service"
+            category["is_leaf"] = True
+        
+        categories.append(category)
+        entities_found.append(category)
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        filepath = os.path.join(output_folder, 'categories.json')
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, json.dumps(categories, indent=4).encode('utf-8'))
+        finally:
+            os.close(fd)
+        files_created.append('categories.json')
 
     return {"entities_found": entities_found, "files_created": files_created}
\ No newline at end of file
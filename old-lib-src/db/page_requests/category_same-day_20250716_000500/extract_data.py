@@ -1,18 +1,29 @@
 import json
-from bs4 import BeautifulSoup
+from lxml import html
+from lxml.etree import XPath
 import os
 
-def extract_data(html_content, output_folder=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every link
+_LINKS = XPath(f"//a[{_has_class('e-1qcnqs9')}]")
+_IMAGE = XPath("(.//img)[1]")
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
     categories = []
     products = []
     services = []
     entities_found = []
     files_created = []
 
-    for a_tag in soup.find_all('a', class_='e-1qcnqs9'):
+    for a_tag in _LINKS(tree):
         href = a_tag.get('href')
-        img_alt = a_tag.find('img').get('alt')
+        img_alt = _IMAGE(a_tag)[0].get('alt')
         category = {
             "name": img_alt,
             "url": href,
@@ -39,8 +50,11 @@ def extract_data(html_content, output_folder=None):
         entities_found.append("categories")
         if output_folder:
             filepath = os.path.join(output_folder, "categories.json")
-            with open(filepath, 'w') as f:
-                json.dump(categories, f, indent=4)
+            fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, json.dumps(categories, indent=4).encode('utf-8'))
+            finally:
+                os.close(fd)
             files_created.append(filepath)
 
     return {
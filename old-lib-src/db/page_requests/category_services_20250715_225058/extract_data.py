@@ -1,21 +1,50 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-    except Exception as e:
-        return {'entities_found': [], 'files_created': [], 'error': f'Error parsing HTML: {e}'}
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_PRODUCTS = XPath(f"//div[{_has_class('product')}]") # Replace with actual class/tag
+_PRODUCT_NAME = XPath("(.//h2)[1]")
+_PRODUCT_PRICE = XPath(f"(.//span[{_has_class('price')}])[1]")
+_CATEGORIES = XPath(f"//div[{_has_class('category')}]") # Replace with actual class/tag
+_CATEGORY_NAME = XPath("(.//h3)[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
 
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
     entities = {}
     files_created = []
 
     # Example:  Adapt to the actual HTML structure.  This is a placeholder.
-    for product in soup.find_all('div', class_='product'): # Replace with actual class/tag
+    for product in _PRODUCTS(tree):
         product_data = {
-            'name': product.find('h2').text.strip() if product.find('h2') else None,
-            'price': product.find('span', class_='price').text.strip() if product.find('span', class_='price') else None,
+            'name': _TEXT(_PRODUCT_NAME(product)[0]).strip() if _PRODUCT_NAME(product) else None,
+            'price': _TEXT(_PRODUCT_PRICE(product)[0]).strip() if _PRODUCT_PRICE(product) else None,
             # Add other product attributes as needed
         }
         if 'products' not in entities:
@@ -23,9 +52,9 @@ def extract_data(html_content, output_folder=None):
         entities['products'].append(product_data)
 
 
-    for category in soup.find_all('div', class_='category'): # Replace with actual class/tag
+    for category in _CATEGORIES(tree):
         category_data = {
-            'name': category.find('h3').text.strip() if category.find('h3') else None,
+            'name': _TEXT(_CATEGORY_NAME(category)[0]).strip() if _CATEGORY_NAME(category) else None,
             # Add other category attributes as needed
         }
         if 'categories' not in entities:
@@ -38,13 +67,11 @@ def extract_data(html_content, output_folder=None):
 
     if output_folder:
         os.makedirs(output_folder, exist_ok=True)
+        writes = []
         for entity_type, data in entities.items():
             filepath = os.path.join(output_folder, f'{entity_type}.json')
-            try:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4)
-                files_created.append(filepath)
-            except Exception as e:
-                return {'entities_found': list(entities.keys()), 'files_created': files_created, 'error': f'Error writing JSON file: {e}'}
+            writes.append((filepath, data))
+        _write_all(writes)
+        files_created.extend(filepath for filepath, _ in writes)
 
     return {'entities_found': list(entities.keys()), 'files_created': files_created}
\ No newline at end of file
@@ -1,36 +1,50 @@
 import json
 import os
-from bs4 import BeautifulSoup
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities = {}
-        entities_found = []
-        files_created = []
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
 
-        # Extract services
-        services = []
-        for tile in soup.find_all('div', class_='CSLPtile'):
-            service = {}
-            service['title'] = tile.find('h2').text.strip()
-            service['description'] = tile.find('p').text.strip()
-            service['url'] = tile.find('a')['href']
-            service['image'] = tile.find('img', class_='CSLPtileimage')['src']
-            services.append(service)
-        if services:
-            entities['services'] = services
-            entities_found.append('services')
+# Queries compiled once at import and evaluated by libxml2 for every service tile
+_TILES = XPath(f"//div[{_has_class('CSLPtile')}]")
+_TITLE = XPath("(.//h2)[1]")
+_DESCRIPTION = XPath("(.//p)[1]")
+_LINK = XPath("(.//a)[1]")
+_IMAGE = XPath(f"(.//img[{_has_class('CSLPtileimage')}])[1]")
+_TEXT = XPath("string()", smart_strings=False)
 
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            for entity_type, entity_data in entities.items():
-                filepath = os.path.join(output_folder, f"{entity_type}.json")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(entity_data, f, indent=4)
-                files_created.append(filepath)
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
 
-        return {'entities_found': entities_found, 'files_created': files_created}
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities = {}
+    entities_found = []
+    files_created = []
 
-    except Exception as e:
-        return {'entities_found': [], 'files_created': [], 'error': str(e)}
\ No newline at end of file
+    # Extract services
+    services = []
+    for tile in _TILES(tree):
+        service = {}
+        service['title'] = _TEXT(_TITLE(tile)[0]).strip()
+        service['description'] = _TEXT(_DESCRIPTION(tile)[0]).strip()
+        service['url'] = _LINK(tile)[0].attrib['href']
+        service['image'] = _IMAGE(tile)[0].attrib['src']
+        services.append(service)
+    if services:
+        entities['services'] = services
+        entities_found.append('services')
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        for entity_type, entity_data in entities.items():
+            filepath = os.path.join(output_folder, f"{entity_type}.json")
+            fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, json.dumps(entity_data, indent=4).encode('utf-8'))
+            finally:
+                os.close(fd)
+            files_created.append(filepath)
+
+    return {'entities_found': entities_found, 'files_created': files_created}
\ No newline at end of file
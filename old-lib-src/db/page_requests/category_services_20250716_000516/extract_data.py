@@ -1,21 +1,65 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import etree, html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every element
+_CRUMB_NAME = XPath("(.//span[@itemprop='name'])[1]")
+_CRUMB_LINK = XPath("(.//a)[1]")
+_SERVICE_LINK = XPath(f"(.//a[{_has_class('external')}])[1]")
+_SERVICE_NAME = XPath("(.//h2)[1]")
+_SERVICE_DESCRIPTION = XPath("(.//p)[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
     categories = []
     services = []
     entities_found = []
     files_created = []
+    writes = []
+
+    # One pass over the document finds the breadcrumbs and every service tile
+    breadcrumb = None
+    service_tiles = []
+    for _, element in etree.iterwalk(tree, events=('start',), tag=('ol', 'div')):
+        classes = element.get('class', '').split()
+        if element.tag == 'div':
+            if 'CSLPtile' in classes:
+                service_tiles.append(element)
+        elif breadcrumb is None and 'crumbs' in classes:
+            breadcrumb = element
 
     # Extract categories from breadcrumbs
-    breadcrumb = soup.find('ol', {'class': 'crumbs'})
-    if breadcrumb:
-        for li in breadcrumb.find_all('li'):
-            a_tag = li.find('a')
-            name = li.find('span', itemprop='name').text.strip()
-            url = a_tag['href'] if a_tag else None
+    if breadcrumb is not None:
+        for li in breadcrumb.iter('li'):
+            a_tag = _CRUMB_LINK(li)
+            name = _TEXT(_CRUMB_NAME(li)[0]).strip()
+            url = a_tag[0].attrib['href'] if a_tag else None
             categories.append({
                 "name": name,
                 "url": url,
@@ -28,12 +72,11 @@ def extract_data(html_content, output_folder=None):
             })
 
     #Extract services
-    service_tiles = soup.find_all('div', {'class': 'CSLPtile'})
     for tile in service_tiles:
-        a_tag = tile.find('a', class_='external')
-        name = tile.find('h2').text.strip()
-        url = a_tag['href']
-        description = tile.find('p').text.strip()
+        a_tag = _SERVICE_LINK(tile)[0]
+        name = _TEXT(_SERVICE_NAME(tile)[0]).strip()
+        url = a_tag.attrib['href']
+        description = _TEXT(_SERVICE_DESCRIPTION(tile)[0]).strip()
         services.append({
             "name": name,
             "url": url,
@@ -45,18 +88,17 @@ def extract_data(html_content, output_folder=None):
         entities_found.append("categories")
         if output_folder:
             filepath = os.path.join(output_folder, 'categories.json')
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(categories, f, indent=4)
+            writes.append((filepath, categories))
             files_created.append(filepath)
 
     if services:
         entities_found.append("services")
         if output_folder:
             filepath = os.path.join(output_folder, 'services.json')
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(services, f, indent=4)
+            writes.append((filepath, services))
             files_created.append(filepath)
 
+    _write_all(writes)
     return {
         "entities_found": entities_found,
         "files_created": files_created
@@ -1,54 +1,89 @@
-import json
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from lxml import html
+from lxml.etree import XPath
 
-def extract_data(html_content, output_folder=None):
+# Shared by every call so the JSON files for one page are written concurrently
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _write_json(path, data):
+    # One raw write of the serialized bytes, without a buffered file object
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        entities = {}
-        entities_found = []
-        files_created = []
-
-        #Extract promotions
-        promotions = []
-        for item in soup.find_all(class_='card image-card'):
-            promotion = {
-                'item_name': item.get('data-item_name'),
-                'link_to': item.get('data-link-to'),
-                'packageid': item.get('data-packageid'),
-                'href': item.get('href'),
-                'title': item.find(data_test="offerCardTitle").text.strip(),
-                'summary': item.find(data_test="offerCardSummary").text.strip().replace('\n',', ')
-            }
-            promotions.append(promotion)
-        if promotions:
-            entities['promotions'] = promotions
-            entities_found.append('promotions')
-
-
-        # Extract carousel items
-        carousel_items = []
-        for item in soup.select('ul.carousel-items > li'):
-            carousel_item = {
-                'item_name': item.find(data_test="carouselOfferItemName").text.strip() if item.find(data_test="carouselOfferItemName") else None,
-                'item_heading': item.find(data_test="carouselOfferHeading").text.strip() if item.find(data_test="carouselOfferHeading") else None,
-                'item_description': item.find(data_test="carouselOfferItemDescription").text.strip() if item.find(data_test="carouselOfferItemDescription") else None,
-                'bullets': [li.text.strip() for li in item.select('ul.check > li')],
-                'details_link': item.select_one('a.details-link').get('href') if item.select_one('a.details-link') else None
-            }
-            carousel_items.append(carousel_item)
-        if carousel_items:
-            entities['carousel_items'] = carousel_items
-            entities_found.append('carousel_items')
-
-        if output_folder:
-            os.makedirs(output_folder, exist_ok=True)
-            for entity_type, entity_data in entities.items():
-                file_path = os.path.join(output_folder, f"{entity_type}.json")
-                with open(file_path, 'w') as f:
-                    json.dump(entity_data, f, indent=4)
-                files_created.append(file_path)
-
-        return {'entities_found': entities_found, 'files_created': files_created}
-    except Exception as e:
-        return {'entities_found': [], 'files_created': [], 'error': str(e)}
\ No newline at end of file
+        os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    finally:
+        os.close(fd)
+
+def _write_all(writes):
+    # Write each (path, data) pair on the pool, re-raising the first failure
+    futures = [_IO_POOL.submit(_write_json, path, data) for path, data in writes]
+    for future in futures:
+        future.result()
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Queries compiled once at import and evaluated by libxml2 for every card
+_PROMOTION_CARDS = XPath("//*[@class='card image-card']")
+_OFFER_TITLE = XPath("(.//*[@data_test='offerCardTitle'])[1]")
+_OFFER_SUMMARY = XPath("(.//*[@data_test='offerCardSummary'])[1]")
+_CAROUSEL_ITEMS = XPath(f"//ul[{_has_class('carousel-items')}]/li")
+_CAROUSEL_NAME = XPath("(.//*[@data_test='carouselOfferItemName'])[1]")
+_CAROUSEL_HEADING = XPath("(.//*[@data_test='carouselOfferHeading'])[1]")
+_CAROUSEL_DESCRIPTION = XPath("(.//*[@data_test='carouselOfferItemDescription'])[1]")
+_CAROUSEL_BULLETS = XPath(f".//ul[{_has_class('check')}]/li")
+_DETAILS_LINK = XPath(f"(.//a[{_has_class('details-link')}])[1]")
+_TEXT = XPath("string()", smart_strings=False)
+
+# Pages arrive as UTF-8 bytes that do not always declare their charset
+_PARSER = html.HTMLParser(encoding='utf-8')
+
+def extract_data(html_bytes, output_folder=None):
+    tree = html.fromstring(html_bytes, parser=_PARSER)
+    entities = {}
+    entities_found = []
+    files_created = []
+    writes = []
+
+    #Extract promotions
+    promotions = []
+    for item in _PROMOTION_CARDS(tree):
+        promotion = {
+            'item_name': item.get('data-item_name'),
+            'link_to': item.get('data-link-to'),
+            'packageid': item.get('data-packageid'),
+            'href': item.get('href'),
+            'title': _TEXT(_OFFER_TITLE(item)[0]).strip(),
+            'summary': _TEXT(_OFFER_SUMMARY(item)[0]).strip().replace('\n',', ')
+        }
+        promotions.append(promotion)
+    if promotions:
+        entities['promotions'] = promotions
+        entities_found.append('promotions')
+
+
+    # Extract carousel items
+    carousel_items = []
+    for item in _CAROUSEL_ITEMS(tree):
+        carousel_item = {
+            'item_name': _TEXT(_CAROUSEL_NAME(item)[0]).strip() if _CAROUSEL_NAME(item) else None,
+            'item_heading': _TEXT(_CAROUSEL_HEADING(item)[0]).strip() if _CAROUSEL_HEADING(item) else None,
+            'item_description': _TEXT(_CAROUSEL_DESCRIPTION(item)[0]).strip() if _CAROUSEL_DESCRIPTION(item) else None,
+            'bullets': [_TEXT(li).strip() for li in _CAROUSEL_BULLETS(item)],
+            'details_link': _DETAILS_LINK(item)[0].get('href') if _DETAILS_LINK(item) else None
+        }
+        carousel_items.append(carousel_item)
+    if carousel_items:
+        entities['carousel_items'] = carousel_items
+        entities_found.append('carousel_items')
+
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        for entity_type, entity_data in entities.items():
+            file_path = os.path.join(output_folder, f"{entity_type}.json")
+            writes.append((file_path, entity_data))
+            files_created.append(file_path)
+
+    _write_all(writes)
+    return {'entities_found': entities_found, 'files_created': files_created}
\ No newline at end of file
@@ -226,6 +226,7 @@ class Pagent:
         timeout: int = 30,
         save_html: bool = True,
         filename: Optional[str] = None,
+        keep_bytes: bool = False,
     ) -> Dict:
         """
         Fetch page using standard requests library.
@@ -236,6 +237,7 @@ class Pagent:
             timeout: Request timeout in seconds
             save_html: Whether to save HTML to file
             filename: Custom filename for saved HTML
+            keep_bytes: Also return the body as UTF-8 bytes under content_bytes
 
         Returns:
             Dict with response data and metadata
@@ -258,6 +260,17 @@ class Pagent:
                 "error": None,
             }
 
+            if keep_bytes:
+                # Hand over the body as UTF-8 bytes for parsers that take bytes
+                # directly, re-encoding only when the server declared another charset
+                content_bytes = response.content
+                if (response.encoding or "").lower().replace("_", "-") not in (
+                    "utf-8",
+                    "utf8",
+                ):
+                    content_bytes = response.text.encode("utf-8")
+                result["content_bytes"] = content_bytes
+
             if save_html:
                 filepath, request_folder = self._save_html(
                     response.text, url, "requests", filename
@@ -288,6 +301,7 @@ class Pagent:
         save_html: bool = True,
         filename: Optional[str] = None,
         screenshot: bool = False,
+        keep_bytes: bool = False,
     ) -> Dict:
         """
         Fetch page using Playwright for JavaScript-heavy sites with anti-detection.
@@ -301,6 +315,8 @@ class Pagent:
             save_html: Whether to save HTML to file
             filename: Custom filename for saved HTML
             screenshot: Whether to take a screenshot
+            keep_bytes: Accepted for parity with fetch_with_requests; Playwright
+                only yields decoded markup, so no content_bytes are returned
 
         Returns:
             Dict with response data and metadata
@@ -213,6 +213,41 @@ class TestCostcoAPI(unittest.TestCase):
         self.assertIn("text/html", response.headers.get("content-type", ""))
 
 
+class TestCostcoAPIProductDefaults(unittest.TestCase):
+    """In-process checks that the fast products path keeps product_model defaults"""
+    
+    def setUp(self):
+        """Point the API at a fresh temporary database"""
+        import tempfile
+        from unittest import mock
+        import costco_api
+        from costco_database import CostcoDatabase
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = CostcoDatabase(str(Path(self.temp_dir.name) / "api.db"))
+        patcher = mock.patch.object(costco_api, "db", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = costco_api.app.test_client()
+    
+    def tearDown(self):
+        """Close the temporary database"""
+        self.db.close()
+        self.temp_dir.cleanup()
+    
+    def test_products_list_null_currency_defaults_to_cad(self):
+        """Test products listed with a NULL currency report the model default"""
+        session_id = self.db.start_scraping_session()
+        self.db.save_product(session_id, {"name": "Test Product", "currency": None})
+        
+        response = self.client.get(f"/api/v1/products?session_id={session_id}")
+        self.assertEqual(response.status_code, 200)
+        
+        data = response.get_json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["currency"], "CAD")
+
+
 if __name__ == "__main__":
     print("🧪 Running Costco API Test Suite")
     print("=" * 50)
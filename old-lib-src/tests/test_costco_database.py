@@ -17,23 +17,44 @@ from costco_database import CostcoDatabase
 from category_interface import CategoryItem, CategoryType
 
 
+class _TestCostcoDatabase(CostcoDatabase):
+    """CostcoDatabase without the fsyncs a throwaway test database doesn't need"""
+
+    def _open_connection(self):
+        conn = super()._open_connection()
+        # WAL is kept so pooled connections still read while another writes
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+
 class TestCostcoDatabase(unittest.TestCase):
     """Test suite for CostcoDatabase functionality"""
     
     def setUp(self):
         """Set up test fixtures"""
-        # Create temporary database for testing
-        self.temp_db = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
-        self.temp_db.close()
-        self.db = CostcoDatabase(self.temp_db.name)
+        # Shared-cache in-memory database so every pooled connection sees the
+        # same data; it is dropped when the last connection closes
+        self.temp_db = None
+        self.db = _TestCostcoDatabase(f"file:{self.id()}?mode=memory&cache=shared")
     
     def tearDown(self):
         """Clean up after tests"""
         self.db.close()
-        Path(self.temp_db.name).unlink(missing_ok=True)
-    
+        if self.temp_db is not None:
+            Path(self.temp_db.name).unlink(missing_ok=True)
+
+    def _use_disk_database(self):
+        """Replace the in-memory database with a temporary file for tests that inspect it"""
+        self.db.close()
+        self.temp_db = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        self.temp_db.close()
+        self.db = _TestCostcoDatabase(self.temp_db.name)
+
     def test_database_initialization(self):
         """Test database initialization and schema creation"""
+        self._use_disk_database()
+
         # Check that database file exists
         self.assertTrue(Path(self.temp_db.name).exists())
         
@@ -147,16 +168,17 @@ class TestCostcoDatabase(unittest.TestCase):
         
         # Save multiple categories
         categories = [
-            CategoryItem("Electronics", "/electronics", CategoryType.NON_LEAF_NAVIGATION),
+            CategoryItem("Electronics", "/electronics", CategoryType.NON_LEAF_NAV),
             CategoryItem("Computers", "/computers", CategoryType.LEAF_PRODUCT),
             CategoryItem("Phones", "/phones", CategoryType.LEAF_PRODUCT)
         ]
         
-        for category in categories:
-            self.db.save_category(session_id, category)
+        with self.db.batch():
+            for category in categories:
+                self.db.save_category(session_id, category)
         
         # Retrieve and verify
-        saved_categories = self.db.get_categories_by_session(session_id)
+        saved_categories = self.db.get_categories(session_id)
         self.assertEqual(len(saved_categories), 3)
         
         names = [cat['name'] for cat in saved_categories]
@@ -174,13 +196,15 @@ class TestCostcoDatabase(unittest.TestCase):
         
         # Save multiple products
         products = [
-            {"name": "MacBook Pro", "price": 2499.99, "brand": "Apple"},
-            {"name": "Dell XPS", "price": 1999.99, "brand": "Dell"},
-            {"name": "Surface Pro", "price": 1799.99, "brand": "Microsoft"}
+            {"name": "MacBook Pro", "price": 2499.99, "brand": "Apple", "item_number": "1"},
+            {"name": "Dell XPS", "price": 1999.99, "brand": "Dell", "item_number": "2"},
+            {"name": "Surface Pro", "price": 1799.99, "brand": "Microsoft", "item_number": "3"}
         ]
         
-        for product in products:
-            self.db.save_product(session_id, category_id, product)
+        with self.db.batch():
+            for position, product in enumerate(products):
+                product_id = self.db.save_product(session_id, product)
+                self.db.link_category_product(category_id, product_id, position)
         
         # Retrieve and verify
         saved_products = self.db.get_products_by_category(category_id)
@@ -201,29 +225,66 @@ class TestCostcoDatabase(unittest.TestCase):
         
         # Save products with different names and brands
         products = [
-            {"name": "MacBook Pro 16", "brand": "Apple", "price": 2499.99},
-            {"name": "MacBook Air", "brand": "Apple", "price": 1299.99},
-            {"name": "Dell XPS 13", "brand": "Dell", "price": 1999.99},
-            {"name": "Surface Laptop", "brand": "Microsoft", "price": 1799.99}
+            {"name": "MacBook Pro 16", "brand": "Apple", "price": 2499.99, "item_number": "1"},
+            {"name": "MacBook Air", "brand": "Apple", "price": 1299.99, "item_number": "2"},
+            {"name": "Dell XPS 13", "brand": "Dell", "price": 1999.99, "item_number": "3"},
+            {"name": "Surface Laptop", "brand": "Microsoft", "price": 1799.99, "item_number": "4"}
         ]
         
-        for product in products:
-            self.db.save_product(session_id, category_id, product)
+        with self.db.batch():
+            for position, product in enumerate(products):
+                product_id = self.db.save_product(session_id, product)
+                self.db.link_category_product(category_id, product_id, position)
         
         # Test search by name
-        results = self.db.search_products("MacBook")
+        results = self.db.search_products(session_id, "MacBook")
         self.assertEqual(len(results), 2)
         
         # Test search by brand
-        results = self.db.search_products("Apple")
+        results = self.db.search_products(session_id, "Apple")
         self.assertEqual(len(results), 2)
         
         # Test search with no results
-        results = self.db.search_products("Nintendo")
+        results = self.db.search_products(session_id, "Nintendo")
         self.assertEqual(len(results), 0)
-    
+
+    def test_batch_rolls_back_on_error(self):
+        """Test that a failing batch leaves none of its writes behind"""
+        session_id = self.db.start_scraping_session()
+        
+        with self.assertRaises(RuntimeError):
+            with self.db.batch():
+                self.db.save_product(session_id, {"name": "MacBook Pro", "item_number": "1"})
+                raise RuntimeError("abort batch")
+        
+        self.assertEqual(self.db.search_products(session_id, "MacBook"), [])
+
+    def test_search_products_full_text(self):
+        """Test FTS5 prefix search and index sync on replace"""
+        if not self.db.fts_enabled:
+            self.skipTest("SQLite built without FTS5")
+
+        session_id = self.db.start_scraping_session()
+        self.db.save_product(session_id, {"name": "MacBook Pro 16", "brand": "Apple", "item_number": "1"})
+        self.db.save_product(session_id, {"name": "Crème Brûlée Torch", "brand": "Iwatani", "item_number": "2"})
+
+        # Prefix, multi-word and diacritic-insensitive matches
+        self.assertEqual(len(self.db.search_products(session_id, "macb")), 1)
+        self.assertEqual(len(self.db.search_products(session_id, "apple pro")), 1)
+        self.assertEqual(len(self.db.search_products(session_id, "creme brulee")), 1)
+
+        # FTS5 syntax in user input is treated as plain words
+        self.assertEqual(self.db.search_products(session_id, 'pro" OR *'), [])
+
+        # INSERT OR REPLACE keeps the index in sync
+        self.db.save_product(session_id, {"name": "Blowtorch", "brand": "Iwatani", "item_number": "2"})
+        self.assertEqual(self.db.search_products(session_id, "creme"), [])
+        self.assertEqual(len(self.db.search_products(session_id, "blowtorch")), 1)
+
     def test_get_database_stats(self):
         """Test database statistics collection"""
+        self._use_disk_database()
+
         session_id1 = self.db.start_scraping_session()
         session_id2 = self.db.start_scraping_session()
         
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for the Costco Database API.
+
+Run under a production server instead of Flask's development server, e.g.:
+
+    gunicorn -w 4 -k gthread --threads 4 -b 0.0.0.0:5001 wsgi:app
+
+Threaded workers let the SQLite reads of concurrent requests overlap, since
+sqlite3 releases the GIL while a query runs. Keep --threads at or below the
+CostcoDatabase pool size so request threads don't queue for a connection.
+"""
+
+from costco_api import app
+
+__all__ = ["app"]